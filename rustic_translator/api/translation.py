@@ -2,11 +2,40 @@
 # For license information, please see license.txt
 
 import frappe
-import csv
+import json
 import os
 import shutil
+from contextlib import contextmanager
+from itertools import chain
 from frappe import _
-from frappe.utils import now_datetime, get_bench_path
+from frappe.utils import cint, now_datetime, get_bench_path
+from werkzeug.wrappers import Response
+
+from rustic_translator.backup_store import get_object_path, restore_backup, store_backup
+from rustic_translator.cache_invalidation import invalidate_translation_cache
+from rustic_translator.csv_store import CSVTranslationStore, FileLockTimeout, copy_file, lock_file
+from rustic_translator.file_cache import (
+    get_file_version,
+    get_translation_keys,
+    invalidate,
+    iter_translation_rows,
+    translation_key,
+)
+from rustic_translator.save_pipeline import enqueue_save, get_job_status, get_removed_keys, resolve_changes
+from rustic_translator.source_index import enqueue_refresh, find_source
+from rustic_translator.sqlite_store import SQLiteTranslationStore
+from rustic_translator.translation_sync import (
+    BATCH_SIZE,
+    delete_translation_source,
+    sync_translations,
+    upsert_translation,
+)
+
+# Only allow translating these apps
+ALLOWED_APPS = ("frappe", "erpnext", "rustic_translator")
+
+# Part of every ETag of load_translations, bump it when its response changes shape
+WIRE_VERSION = "1"
 
 
 def check_translation_manager_permission():
@@ -26,18 +55,46 @@ def get_translation_file_path(app_name, language_code):
     return os.path.join(apps_path, app_name, app_name, "translations", f"{language_code}.csv")
 
 
+def get_translation_store(file_path):
+    """Return the store the editor reads and writes a translation file through"""
+    if frappe.db.get_single_value("Translation Manager Settings", "storage_backend") == "SQLite":
+        return SQLiteTranslationStore(file_path)
+    return CSVTranslationStore(file_path)
+
+
+def check_file_version(file_path, version=None):
+    """Throw if the file changed since the client loaded the given version"""
+    if version and version != get_file_version(file_path):
+        frappe.throw(
+            _("The translation file was changed by someone else since you loaded it. Please reload and try again."),
+            frappe.TimestampMismatchError
+        )
+
+
+@contextmanager
+def lock_translation_file(file_path, version=None, timeout=None):
+    """
+    Hold the write lock of a translation file for a read-modify-write cycle
+    - version is the token returned by load_translations, checked under the lock
+    """
+    try:
+        lock = lock_file(file_path, timeout) if timeout else lock_file(file_path)
+        with lock:
+            check_file_version(file_path, version)
+            yield
+    except FileLockTimeout:
+        frappe.throw(_("The translation file is being saved by someone else. Please try again."))
+
+
 @frappe.whitelist()
 def get_available_apps():
     """Get list of apps that have translations directory (only frappe and erpnext)"""
     check_translation_manager_permission()
 
-    # Only allow translating these apps
-    allowed_apps = ["frappe", "erpnext", "rustic_translator"]
-
     apps_path = get_apps_path()
     available_apps = []
 
-    for app_name in allowed_apps:
+    for app_name in ALLOWED_APPS:
         app_path = os.path.join(apps_path, app_name)
         translations_path = os.path.join(app_path, app_name, "translations")
 
@@ -64,9 +121,43 @@ def get_available_languages(app_name):
     return sorted(languages)
 
 
+def get_conditional_request():
+    """Return the current request if its response may be cached by the browser, i.e. a GET"""
+    request = getattr(frappe.local, "request", None)
+    return request if request is not None and request.method == "GET" else None
+
+
+def cacheable_response(data, etag):
+    """
+    Return data as the JSON of a whitelisted method, revalidated by the browser with etag
+    - Encoded compactly and without escaping non-ASCII text
+    """
+    response = Response(
+        json.dumps({"message": data}, ensure_ascii=False, separators=(",", ":")),
+        content_type="application/json; charset=utf-8"
+    )
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified_response(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @frappe.whitelist()
-def load_translations(app_name, language_code):
-    """Load translations from CSV file and return as JSON"""
+def load_translations(app_name, language_code, start=0, page_length=None, search_text=None, empty_only=0, columnar=0):
+    """
+    Load translations from CSV file and return as JSON
+    - Search and the empty-only filter are applied on the server
+    - When page_length is given only that slice of the filtered rows is returned
+    - columnar returns the rows as "columns", one list per field, instead of a list of dicts
+    - A GET is answered with an ETag of the file version, and with 304 Not Modified
+      when the browser already holds the response for that version
+    """
     check_translation_manager_permission()
 
     file_path = get_translation_file_path(app_name, language_code)
@@ -74,52 +165,74 @@ def load_translations(app_name, language_code):
     if not os.path.exists(file_path):
         frappe.throw(_("Translation file not found: {0}").format(file_path))
 
+    start = max(cint(start), 0)
+    page_length = cint(page_length) if page_length not in (None, "") else None
+    empty_only = cint(empty_only)
+    columnar = cint(columnar)
+    query = (search_text or "").strip()
+
+    # The URL carries the other arguments, so the file version identifies the response.
+    # Row ids are positions, which every worker and store numbers as a fresh parse
+    # of that version would (see file_cache), so any worker may confirm the tag
+    request = get_conditional_request()
+    etag = "{}-{}-{}".format(WIRE_VERSION, columnar, get_file_version(file_path))
+    if request is not None and request.if_none_match.contains(etag):
+        return not_modified_response(etag)
+
     # Get file modification time for debugging
     file_mtime = os.path.getmtime(file_path)
     file_mtime_str = now_datetime().strftime("%Y-%m-%d %H:%M:%S")
 
-    translations = []
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for idx, row in enumerate(reader):
-            if len(row) >= 2:
-                source_text = row[0]
-                translated_text = row[1]
-                context = row[2] if len(row) > 2 else ""
-
-                translations.append({
-                    "id": idx,
-                    "source_text": source_text,
-                    "translated_text": translated_text,
-                    "context": context
-                })
-
-    # Get first 3 translations for debugging
-    debug_first_3 = []
-    for t in translations[:3]:
-        debug_first_3.append({
-            "source": t["source_text"][:30],
-            "translated": t["translated_text"][:30] if t["translated_text"] else ""
-        })
-
-    return {
-        "translations": translations,
-        "total_count": len(translations),
+    store = get_translation_store(file_path)
+    page, filtered_count, total_count, empty_count = store.search(query, empty_only, start, page_length)
+
+    if columnar:
+        columns = {"id": [], "source_text": [], "translated_text": [], "context": []}
+        for idx, row in page:
+            columns["id"].append(idx)
+            columns["source_text"].append(row[0])
+            columns["translated_text"].append(row[1])
+            columns["context"].append(row[2] if len(row) > 2 else "")
+        rows = {"columns": columns}
+    else:
+        translations = []
+        for idx, row in page:
+            translations.append({
+                "id": idx,
+                "source_text": row[0],
+                "translated_text": row[1],
+                "context": row[2] if len(row) > 2 else ""
+            })
+        rows = {"translations": translations}
+
+    data = {
+        **rows,
+        "total_count": total_count,
+        "filtered_count": filtered_count,
+        "empty_count": empty_count,
+        "start": start,
+        "page_length": page_length,
         "file_path": file_path,
         "file_mtime": file_mtime,
-        "loaded_at": file_mtime_str,
-        "debug_first_3": debug_first_3
+        "version": store.version,
+        "loaded_at": file_mtime_str
     }
 
+    if request is not None:
+        # Tagged with the version the rows were read at, a later write gets a new tag
+        return cacheable_response(data, "{}-{}-{}".format(WIRE_VERSION, columnar, store.version))
+
+    return data
+
 
 @frappe.whitelist()
-def save_translations(app_name, language_code, translations, site_name=None, session_name=None):
+def save_translations(app_name, language_code, translations, site_name=None, session_name=None, version=None):
     """
-    Save translations to CSV file
-    - Creates backup before saving
-    - Clears translation cache
-    - Handles rollback on failure
+    Replace a translation CSV file with the given translations
+    - Queues the save pipeline and returns its job id at once
+    - The job creates a backup, writes, verifies, syncs the DB and clears the cache
+    - Progress is published to the editor over realtime
+    - version is the token from load_translations, the job fails on a mismatch
     """
     import json as json_module
 
@@ -150,117 +263,142 @@ def save_translations(app_name, language_code, translations, site_name=None, ses
     if len(translations) == 0:
         frappe.throw(_("No translations to save"))
 
-    # Get settings
-    settings = frappe.get_single("Translation Manager Settings")
-    backup_retention = settings.backup_retention_count or 10
+    rows = []
+    for trans in translations:
+        if not isinstance(trans, dict):
+            continue
 
-    if not site_name:
-        site_name = settings.default_site or frappe.local.site
+        source = trans.get("source_text", "")
+        translated = trans.get("translated_text", "")
+        context = trans.get("context", "")
 
-    # Create backup first
-    backup_path = create_backup(app_name, language_code, file_path, session_name)
+        if not source:  # Skip empty source texts
+            continue
 
-    try:
-        # Write new translations to CSV
-        rows_written = 0
-        with open(file_path, "w", encoding="utf-8", newline="") as f:
-            writer = csv.writer(f)
-            for trans in translations:
-                if not isinstance(trans, dict):
-                    continue
-
-                source = trans.get("source_text", "")
-                translated = trans.get("translated_text", "")
-                context = trans.get("context", "")
-
-                if not source:  # Skip empty source texts
-                    continue
-
-                row = [source, translated]
-                if context:
-                    row.append(context)
-                writer.writerow(row)
-                rows_written += 1
-
-        # Verify file was written
-        if not os.path.exists(file_path):
-            frappe.throw(_("File write failed - file does not exist after write"))
-
-        file_size = os.path.getsize(file_path)
-        if file_size == 0:
-            # Restore from backup if file is empty
-            if backup_path and os.path.exists(backup_path):
-                shutil.copy2(backup_path, file_path)
-            frappe.throw(_("File write failed - file is empty after write"))
-
-        # Verify by reading back the file
-        verification_count = 0
-        with open(file_path, "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                verification_count += 1
-
-        # Import translations to database and clear cache
-        execute_bench_commands(site_name, app_name, language_code, file_path)
-
-        # Update settings
-        settings.last_edited_by = frappe.session.user
-        settings.last_edited_on = now_datetime()
-        settings.save(ignore_permissions=True)
-
-        # Commit database changes
-        frappe.db.commit()
+        row = [source, translated]
+        if context:
+            row.append(context)
+        rows.append(row)
 
-        # Cleanup old backups
-        cleanup_old_backups(app_name, language_code, backup_retention)
+    check_file_version(file_path, version)
+    job_id = enqueue_save(app_name, language_code, "rows", rows, site_name, session_name, version)
 
-        return {
-            "success": True,
-            "message": _("Translations saved successfully"),
-            "backup_path": backup_path,
-            "file_path": file_path,
-            "rows_written": rows_written,
-            "file_size": file_size,
-            "verification_count": verification_count
-        }
+    return {
+        "success": True,
+        "queued": True,
+        "message": _("Save queued"),
+        "job_id": job_id,
+        "file_path": file_path
+    }
 
-    except Exception as e:
-        # Rollback: restore from backup
-        if backup_path and os.path.exists(backup_path):
-            shutil.copy2(backup_path, file_path)
 
-        frappe.db.rollback()
-        frappe.log_error(frappe.get_traceback(), "Translation Save Error")
-        frappe.throw(_("Failed to save translations: {0}").format(str(e)))
+@frappe.whitelist()
+def save_translation_changes(app_name, language_code, changes, site_name=None, session_name=None, version=None):
+    """
+    Save only the modified rows of a translation file
+    - changes is a list of {id, source_text, translated_text, context}, id being
+      the position of the edited row; see resolve_changes
+    - Queues the save pipeline and returns its job id at once
+    - The job creates one backup, rewrites the changed rows in one atomic write
+      and syncs only the changed source texts to the database
+    - With a session, the changes are logged in the same transaction
+    - version is the token from load_translations, the job fails on a mismatch
+    """
+    import json as json_module
 
+    check_translation_manager_permission()
 
-def create_backup(app_name, language_code, file_path, session_name=None):
-    """Create a backup of the translation file"""
-    timestamp = now_datetime().strftime("%Y%m%d_%H%M%S")
-    backup_filename = f"{language_code}.csv.backup.{timestamp}"
-    backup_dir = os.path.dirname(file_path)
-    backup_path = os.path.join(backup_dir, backup_filename)
+    file_path = get_translation_file_path(app_name, language_code)
+
+    if not os.path.exists(file_path):
+        frappe.throw(_("Translation file not found: {0}").format(file_path))
+
+    if not os.access(file_path, os.W_OK):
+        frappe.throw(_("No write permission for file: {0}").format(file_path))
+
+    if isinstance(changes, str):
+        try:
+            changes = json_module.loads(changes)
+        except json_module.JSONDecodeError as e:
+            frappe.throw(_("Invalid JSON format: {0}").format(str(e)))
+
+    if not isinstance(changes, list):
+        frappe.throw(_("Invalid changes format. Expected list, got {0}").format(type(changes).__name__))
+
+    if len(changes) == 0:
+        frappe.throw(_("No changes to save"))
+
+    # Reject stale and unknown rows right away, the job checks them again under the lock
+    check_file_version(file_path, version)
+    _updated_rows, missing = resolve_changes(get_translation_store(file_path), changes)
+    if missing:
+        frappe.throw(_("Translations not found in CSV: {0}").format(", ".join(missing[:10])))
+
+    job_id = enqueue_save(app_name, language_code, "changes", changes, site_name, session_name, version)
+
+    return {
+        "success": True,
+        "queued": True,
+        "message": _("Save queued"),
+        "job_id": job_id,
+        "file_path": file_path
+    }
 
-    # Copy the file
-    shutil.copy2(file_path, backup_path)
+
+@frappe.whitelist()
+def get_save_status(job_id):
+    """Return the last reported stage of a queued save"""
+    check_translation_manager_permission()
+
+    return get_job_status(job_id)
+
+
+def create_backup(app_name, language_code, file_path, session_name=None):
+    """
+    Create a backup of the translation file
+    - The content goes to the backup store, shared with identical earlier states
+    - Returns the content hash to restore it with
+    """
+    content_hash = store_backup(app_name, language_code, file_path)
 
     # Create backup record
     backup_doc = frappe.get_doc({
         "doctype": "Translation Backup",
         "app_name": app_name,
         "language_code": language_code,
-        "file_path": backup_path,
+        "file_path": get_object_path(content_hash),
+        "content_hash": content_hash,
         "is_active": 1,
         "backup_timestamp": now_datetime(),
         "session": session_name
     })
     backup_doc.insert(ignore_permissions=True)
 
-    return backup_path
+    return content_hash
+
+
+def get_session_backup(app_name, language_code, file_path, session_name=None):
+    """
+    Return the content hash of the backup of an edit session
+    - Operations in the same session share the backup taken by its first write
+    - Without a session, or if it has no backup of this file yet, a new backup is taken
+    """
+    if session_name:
+        content_hash = frappe.db.get_value("Translation Backup", {
+            "session": session_name,
+            "app_name": app_name,
+            "language_code": language_code,
+            "is_active": 1
+        }, "content_hash")
+
+        if content_hash:
+            return content_hash
+
+    return create_backup(app_name, language_code, file_path, session_name)
 
 
 def cleanup_old_backups(app_name, language_code, retention_count):
-    """Remove old backups beyond retention limit"""
+    """Remove old backups beyond retention limit in one statement, returns how many"""
     backups = frappe.get_all(
         "Translation Backup",
         filters={
@@ -268,155 +406,73 @@ def cleanup_old_backups(app_name, language_code, retention_count):
             "language_code": language_code,
             "is_active": 1
         },
-        fields=["name", "file_path", "backup_timestamp"],
+        fields=["name", "file_path", "content_hash"],
         order_by="backup_timestamp desc"
     )
 
     # Keep only the most recent backups
-    if len(backups) > retention_count:
-        for backup in backups[retention_count:]:
-            # Delete physical file
-            if os.path.exists(backup.file_path):
-                try:
-                    os.remove(backup.file_path)
-                except Exception:
-                    pass
+    expired = backups[retention_count:]
+    if not expired:
+        return 0
+
+    # Backups from before the backup store are plain files
+    for backup in expired:
+        if not backup.content_hash and backup.file_path and os.path.exists(backup.file_path):
+            try:
+                os.remove(backup.file_path)
+            except Exception:
+                pass
 
-            # Delete record
-            frappe.delete_doc("Translation Backup", backup.name, ignore_permissions=True)
+    frappe.db.delete("Translation Backup", {"name": ["in", [backup.name for backup in expired]]})
 
+    return len(expired)
 
-def import_translations_to_db(app_name, language_code, file_path):
-    """Import translations from CSV file into the database using bulk operations"""
+
+def import_translations_to_db(app_name, language_code, file_path, removed_keys=None):
+    """
+    Import translations from CSV file into the database
+    - Only rows that are new or whose translation changed are written
+    - removed_keys, (source_text, context) pairs, are deleted from the database as well
+    - Returns counts of inserted, updated, unchanged and deleted rows
+    """
     try:
-        # Read CSV directly without Frappe's validation
-        translations = []
-        with open(file_path, "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            for row in reader:
-                if len(row) >= 2:
-                    source_text = row[0].strip() if row[0] else ""
-                    translated_text = row[1].strip() if row[1] else ""
-                    if source_text and translated_text:
-                        translations.append({
-                            "source": source_text,
-                            "translated": translated_text,
-                            "context": row[2].strip() if len(row) > 2 and row[2] else None
-                        })
-
-        if not translations:
+        # Read CSV directly without Frappe's validation, streamed into the sync
+        translations = iter_translation_rows(file_path)
+        first = next(translations, None)
+        if first is None:
             return False
 
-        # Get all existing translations for this language in one query
-        # Order by modified DESC so the most recent entry comes first
-        existing = frappe.db.sql("""
-            SELECT name, source_text FROM tabTranslation WHERE language = %s
-            ORDER BY modified DESC
-        """, (language_code,), as_dict=True)
-
-        # Build map keeping only the first (most recent) entry per source_text
-        # and collecting duplicate names for deletion
-        existing_map = {}
-        duplicates_to_delete = []
-        for row in existing:
-            if row.source_text in existing_map:
-                duplicates_to_delete.append(row.name)
-            else:
-                existing_map[row.source_text] = row.name
-
-        # Delete duplicates in batches
-        if duplicates_to_delete:
-            for i in range(0, len(duplicates_to_delete), 500):
-                batch = duplicates_to_delete[i:i+500]
-                frappe.db.sql(
-                    "DELETE FROM tabTranslation WHERE name IN ({})".format(
-                        ", ".join(["%s"] * len(batch))
-                    ),
-                    batch
-                )
-
-        # Prepare bulk operations
-        to_update = []
-        to_insert = []
-
-        for trans in translations:
-            if trans["source"] in existing_map:
-                to_update.append((trans["translated"], existing_map[trans["source"]]))
-            else:
-                to_insert.append((
-                    frappe.generate_hash(length=10),
-                    language_code,
-                    trans["source"],
-                    trans["translated"],
-                    trans["context"],
-                    frappe.session.user,
-                    frappe.session.user
-                ))
-
-        # Bulk update existing translations
-        if to_update:
-            # Update in batches of 500
-            for i in range(0, len(to_update), 500):
-                batch = to_update[i:i+500]
-                for translated_text, name in batch:
-                    frappe.db.sql("""
-                        UPDATE tabTranslation SET translated_text = %s, modified = NOW() WHERE name = %s
-                    """, (translated_text, name))
-
-        # Bulk insert new translations
-        if to_insert:
-            # Insert in batches of 500
-            for i in range(0, len(to_insert), 500):
-                batch = to_insert[i:i+500]
-                frappe.db.sql("""
-                    INSERT INTO `tabTranslation` (name, language, source_text, translated_text, context, creation, modified, owner, modified_by)
-                    VALUES {}
-                """.format(", ".join(["(%s, %s, %s, %s, %s, NOW(), NOW(), %s, %s)"] * len(batch))),
-                    [item for row in batch for item in row]
-                )
+        counts = sync_translations(language_code, chain([first], translations), removed_keys)
 
         frappe.db.commit()
-        return True
+        return counts
 
     except Exception as e:
         frappe.log_error(f"Translation import error: {str(e)}\n{frappe.get_traceback()}", "Translation Import Error")
         return False
 
 
-def execute_bench_commands(site_name, app_name=None, language_code=None, file_path=None):
+def execute_bench_commands(site_name, app_name=None, language_code=None, file_path=None, removed_keys=None):
     """Import translations to DB and clear cache after saving"""
+    import_counts = None
+
     try:
         # Import translations into database
         if app_name and language_code and file_path:
-            import_translations_to_db(app_name, language_code, file_path)
+            import_counts = import_translations_to_db(app_name, language_code, file_path, removed_keys)
 
-        # Clear compiled locale files (.mo files) for this language
         if language_code:
+            # Clear compiled locale files (.mo files) for this language
             clear_locale_cache(language_code)
 
-        # Clear Frappe's translation cache
-        frappe.cache().delete_key("lang_full_dict")
-        frappe.cache().delete_key("lang_user_translations")
-        frappe.cache().delete_keys("lang_*")
-
-        # Clear all translation-related cache keys
-        frappe.cache().delete_keys("translation_*")
-        frappe.cache().delete_keys("*_translations")
-
-        # Clear general cache
-        frappe.clear_cache()
-
-        # Reload translations for current session
-        if hasattr(frappe.local, 'lang'):
-            frappe.local.lang_full_dict = None
-
-        # Clear local translation dict
-        if hasattr(frappe.local, 'lang_full_dict'):
-            frappe.local.lang_full_dict = None
+            # Clear only the translation cache entries of this language
+            invalidate_translation_cache(app_name, language_code, warm=True)
 
     except Exception as e:
         frappe.log_error(f"Cache clear error: {str(e)}", "Translation Cache Error")
 
+    return import_counts
+
 
 def clear_locale_cache(language_code):
     """Clear compiled locale files for a specific language"""
@@ -457,26 +513,35 @@ def restore_from_backup(backup_name):
 
     backup = frappe.get_doc("Translation Backup", backup_name)
 
-    if not os.path.exists(backup.file_path):
+    if not backup.content_hash and not os.path.exists(backup.file_path):
         frappe.throw(_("Backup file not found: {0}").format(backup.file_path))
 
     # Get target file path
     target_path = get_translation_file_path(backup.app_name, backup.language_code)
 
-    # Create a backup of current state before restoring
-    create_backup(backup.app_name, backup.language_code, target_path)
+    with lock_translation_file(target_path):
+        # Create a backup of current state before restoring
+        create_backup(backup.app_name, backup.language_code, target_path)
+        previous_keys = get_translation_keys(target_path)
 
-    # Restore from backup
-    shutil.copy2(backup.file_path, target_path)
+        # Restore from backup, older backups are plain copies of the file
+        if backup.content_hash:
+            restore_backup(backup.content_hash, target_path)
+        else:
+            copy_file(backup.file_path, target_path)
+        invalidate(target_path)
 
-    # Import to database and clear cache
-    settings = frappe.get_single("Translation Manager Settings")
-    site_name = settings.default_site or frappe.local.site
-    execute_bench_commands(site_name, backup.app_name, backup.language_code, target_path)
+        # Import to database and clear cache
+        settings = frappe.get_single("Translation Manager Settings")
+        site_name = settings.default_site or frappe.local.site
+        removed_keys = previous_keys.difference(get_translation_keys(target_path))
+        execute_bench_commands(site_name, backup.app_name, backup.language_code, target_path, removed_keys)
+        new_version = get_file_version(target_path)
 
     return {
         "success": True,
-        "message": _("Translation restored from backup successfully")
+        "message": _("Translation restored from backup successfully"),
+        "version": new_version
     }
 
 
@@ -495,7 +560,7 @@ def get_backups(app_name=None, language_code=None):
     backups = frappe.get_all(
         "Translation Backup",
         filters=filters,
-        fields=["name", "app_name", "language_code", "file_path", "backup_timestamp", "session"],
+        fields=["name", "app_name", "language_code", "file_path", "content_hash", "backup_timestamp", "session"],
         order_by="backup_timestamp desc",
         limit=50
     )
@@ -522,6 +587,7 @@ def create_edit_session(app_name, language_code, site_name=None):
     })
     session.insert()
 
+    # The file is backed up by the first write of the session, see get_session_backup
     return session.name
 
 
@@ -544,6 +610,68 @@ def log_translation_change(session_name, app_name, source_text, old_translation,
     return log.name
 
 
+@frappe.whitelist()
+def log_translation_changes(session_name, app_name, changes):
+    """
+    Log many translation changes with one insert
+    - changes is a list of {source_text, old_translation, new_translation, context}
+    """
+    import json as json_module
+
+    check_translation_manager_permission()
+
+    if isinstance(changes, str):
+        try:
+            changes = json_module.loads(changes)
+        except json_module.JSONDecodeError as e:
+            frappe.throw(_("Invalid JSON format: {0}").format(str(e)))
+
+    if not isinstance(changes, list) or not all(isinstance(change, dict) for change in changes):
+        frappe.throw(_("Invalid changes format. Expected a list of changes"))
+
+    return insert_change_logs(session_name, app_name, [
+        (
+            change.get("source_text"),
+            change.get("old_translation"),
+            change.get("new_translation"),
+            change.get("context")
+        )
+        for change in changes
+        if change.get("source_text")
+    ])
+
+
+def insert_change_logs(session_name, app_name, changes):
+    """
+    Insert Translation Edit Log rows for (source_text, old, new, context) tuples
+    - The doctype is named by hash, so names are generated here as autoname
+      would and cannot collide with logs inserted through the ORM
+    - Rows are written with multi-row inserts, without committing
+    - Returns the inserted names
+    """
+    if not changes:
+        return []
+
+    names = [frappe.generate_hash(length=10) for _change in changes]
+    now = now_datetime()
+    user = frappe.session.user
+
+    frappe.db.bulk_insert(
+        "Translation Edit Log",
+        fields=[
+            "name", "session", "app_name", "source_text", "old_translation", "new_translation",
+            "context", "creation", "modified", "owner", "modified_by"
+        ],
+        values=[
+            (name, session_name, app_name, source_text, old, new, context or None, now, now, user, user)
+            for name, (source_text, old, new, context) in zip(names, changes)
+        ],
+        chunk_size=BATCH_SIZE
+    )
+
+    return names
+
+
 @frappe.whitelist()
 def complete_edit_session(session_name, modified_count=0):
     """Mark an edit session as completed"""
@@ -559,62 +687,50 @@ def complete_edit_session(session_name, modified_count=0):
 
 @frappe.whitelist()
 def detect_app_for_text(source_text):
-    """Detect which app(s) contain the given text in their source code"""
+    """
+    Detect which app(s) contain the given text in their source code
+    - Looks the text up in the source string index instead of scanning the apps
+    - While the index is still being built, indexing is returned as True
+    """
     check_translation_manager_permission()
 
-    import subprocess
-
     if not source_text:
         return {"found_in": [], "files": []}
 
-    apps_path = get_apps_path()
-    found_in = []
-    files = []
+    locations = find_source(source_text)
+    if locations is None:
+        return {"found_in": [], "files": [], "indexing": True}
 
-    # Search in frappe and erpnext
-    for app_name in ["frappe", "erpnext"]:
-        app_path = os.path.join(apps_path, app_name)
-        if not os.path.exists(app_path):
-            continue
-
-        try:
-            # Use grep to search for the text in JS, Python, and HTML files
-            # Escape special characters for grep
-            escaped_text = source_text.replace('"', '\\"').replace("'", "\\'")
-
-            result = subprocess.run(
-                [
-                    "grep", "-r", "-l", "--include=*.js", "--include=*.py",
-                    "--include=*.html", "--include=*.json",
-                    source_text, app_path
-                ],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode == 0 and result.stdout.strip():
-                found_in.append(app_name)
-                # Get first few matching files
-                matched_files = result.stdout.strip().split('\n')[:5]
-                # Clean up paths for display
-                for f in matched_files:
-                    relative_path = f.replace(apps_path + "/", "")
-                    files.append(relative_path)
-
-        except subprocess.TimeoutExpired:
-            pass
-        except Exception as e:
-            frappe.log_error(f"Detection error for {app_name}: {str(e)}", "Translation Detection Error")
+    found_in = [app_name for app_name in ALLOWED_APPS if app_name in locations]
 
     return {
         "found_in": found_in,
-        "files": files
+        # First few matching places per app
+        "files": [location for app_name in found_in for location in locations[app_name][:5]]
     }
 
 
 @frappe.whitelist()
-def add_translation(app_name, language_code, source_text, translated_text, context=None):
+def get_translation_coverage(language_code, app_name=None, start=0, page_length=100):
+    """
+    Get how much of the apps' translatable strings a language covers
+    - Percentages per app and overall, plus one page of the missing strings
+    - While the source string index is still being built, indexing is returned as True
+    """
+    from rustic_translator.coverage import get_coverage
+
+    check_translation_manager_permission()
+
+    coverage = get_coverage(language_code, app_name, max(cint(start), 0), cint(page_length) or 100)
+    if coverage is None:
+        enqueue_refresh()
+        return {"indexing": True}
+
+    return coverage
+
+
+@frappe.whitelist()
+def add_translation(app_name, language_code, source_text, translated_text, context=None, version=None, session_name=None):
     """Add a new translation to the CSV file and database"""
     check_translation_manager_permission()
 
@@ -626,69 +742,45 @@ def add_translation(app_name, language_code, source_text, translated_text, conte
     if not os.path.exists(file_path):
         frappe.throw(_("Translation file not found: {0}").format(file_path))
 
-    # Check if translation already exists in CSV
-    existing_translations = []
-    source_exists = False
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 2:
-                existing_translations.append(row)
-                if row[0].strip() == source_text.strip():
-                    source_exists = True
+    with lock_translation_file(file_path, version):
+        # Check if translation already exists in CSV
+        store = get_translation_store(file_path)
 
-    if source_exists:
-        frappe.throw(_("Translation for '{0}' already exists. Please edit it instead.").format(source_text))
+        if store.find(source_text) is not None:
+            frappe.throw(_("Translation for '{0}' already exists. Please edit it instead.").format(source_text))
 
-    # Create backup before modifying
-    create_backup(app_name, language_code, file_path)
+        # Make sure the file is backed up before modifying
+        get_session_backup(app_name, language_code, file_path, session_name)
 
-    # Append new translation to CSV
-    with open(file_path, "a", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
+        # Append new translation to CSV
         row = [source_text, translated_text]
         if context:
             row.append(context)
-        writer.writerow(row)
 
-    # Add to database
-    existing_db = frappe.db.get_value("Translation", {
-        "language": language_code,
-        "source_text": source_text
-    }, "name")
+        store.append_row(row)
 
-    if existing_db:
-        frappe.db.set_value("Translation", existing_db, "translated_text", translated_text)
-    else:
-        frappe.db.sql("""
-            INSERT INTO `tabTranslation` (name, language, source_text, translated_text, context, creation, modified, owner, modified_by)
-            VALUES (%s, %s, %s, %s, %s, NOW(), NOW(), %s, %s)
-        """, (
-            frappe.generate_hash(length=10),
-            language_code,
-            source_text,
-            translated_text,
-            context,
-            frappe.session.user,
-            frappe.session.user
-        ))
-
-    frappe.db.commit()
+        # Add to database
+        upsert_translation(language_code, source_text, translated_text, context)
+
+        frappe.db.commit()
+
+        # Taken under the lock, so it cannot cover a later write by someone else
+        new_version = get_file_version(file_path)
 
     # Clear caches
     settings = frappe.get_single("Translation Manager Settings")
     site_name = settings.default_site or frappe.local.site
-    execute_bench_commands(site_name, app_name, language_code, file_path)
+    execute_bench_commands(site_name, app_name, language_code)
 
     return {
         "success": True,
-        "message": _("Translation added successfully")
+        "message": _("Translation added successfully"),
+        "version": new_version
     }
 
 
 @frappe.whitelist()
-def update_translation(app_name, language_code, source_text, translated_text, context=None):
+def update_translation(app_name, language_code, source_text, translated_text, context=None, version=None, session_name=None):
     """Update an existing translation in the CSV file and database"""
     check_translation_manager_permission()
 
@@ -700,74 +792,58 @@ def update_translation(app_name, language_code, source_text, translated_text, co
     if not os.path.exists(file_path):
         frappe.throw(_("Translation file not found: {0}").format(file_path))
 
-    # Create backup before modifying
-    create_backup(app_name, language_code, file_path)
-
-    # Read existing translations and update the matching one
-    updated = False
-    updated_translations = []
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 2:
-                if row[0].strip() == source_text.strip():
-                    # Update this row
-                    new_row = [source_text, translated_text]
-                    if context:
-                        new_row.append(context)
-                    elif len(row) > 2:
-                        new_row.append(row[2])  # Keep existing context
-                    updated_translations.append(new_row)
-                    updated = True
-                else:
-                    updated_translations.append(row)
-
-    if not updated:
-        frappe.throw(_("Translation for '{0}' not found in CSV").format(source_text))
-
-    # Write back to CSV
-    with open(file_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(updated_translations)
-
-    # Update database
-    existing_db = frappe.db.get_value("Translation", {
-        "language": language_code,
-        "source_text": source_text
-    }, "name")
-
-    if existing_db:
-        frappe.db.set_value("Translation", existing_db, "translated_text", translated_text)
-    else:
-        frappe.db.sql("""
-            INSERT INTO `tabTranslation` (name, language, source_text, translated_text, context, creation, modified, owner, modified_by)
-            VALUES (%s, %s, %s, %s, %s, NOW(), NOW(), %s, %s)
-        """, (
-            frappe.generate_hash(length=10),
-            language_code,
-            source_text,
-            translated_text,
-            context,
-            frappe.session.user,
-            frappe.session.user
-        ))
-
-    frappe.db.commit()
+    with lock_translation_file(file_path, version):
+        # Find every row with this source text, duplicates included
+        store = get_translation_store(file_path)
+        positions = store.find_all(source_text)
+
+        if not positions:
+            frappe.throw(_("Translation for '{0}' not found in CSV").format(source_text))
+
+        # Make sure the file is backed up before modifying
+        get_session_backup(app_name, language_code, file_path, session_name)
+
+        changes = {}
+        old_keys = set()
+        for position in positions:
+            row = store.get_row(position)
+            old_keys.add(translation_key(row))
+            new_row = [source_text, translated_text]
+            if context:
+                new_row.append(context)
+            elif len(row) > 2:
+                new_row.append(row[2])  # Keep existing context
+            changes[position] = new_row
+
+        # Rewrite only these rows' bytes in the CSV
+        store.apply_changes(changes)
+
+        # Update database, once per context the rows now have
+        for new_source_text, new_context in {translation_key(row) for row in changes.values()}:
+            upsert_translation(language_code, new_source_text, translated_text, new_context)
+
+        for old_source_text, old_context in get_removed_keys(store, old_keys):
+            delete_translation_source(language_code, old_source_text, [old_context])
+
+        frappe.db.commit()
+
+        # Taken under the lock, so it cannot cover a later write by someone else
+        new_version = get_file_version(file_path)
 
     # Clear caches
     settings = frappe.get_single("Translation Manager Settings")
     site_name = settings.default_site or frappe.local.site
-    execute_bench_commands(site_name, app_name, language_code, file_path)
+    execute_bench_commands(site_name, app_name, language_code)
 
     return {
         "success": True,
-        "message": _("Translation updated successfully")
+        "message": _("Translation updated successfully"),
+        "version": new_version
     }
 
 
 @frappe.whitelist()
-def edit_source_text(app_name, language_code, old_source_text, new_source_text, translated_text, context=None):
+def edit_source_text(app_name, language_code, old_source_text, new_source_text, translated_text, context=None, version=None, session_name=None):
     """Edit source text and translation in the CSV file and database"""
     check_translation_manager_permission()
 
@@ -779,78 +855,56 @@ def edit_source_text(app_name, language_code, old_source_text, new_source_text,
     if not os.path.exists(file_path):
         frappe.throw(_("Translation file not found: {0}").format(file_path))
 
-    # Create backup before modifying
-    create_backup(app_name, language_code, file_path)
-
-    # Read existing translations and update the matching one
-    updated = False
-    updated_translations = []
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 2:
-                if row[0].strip() == old_source_text.strip():
-                    # Update this row with new source text
-                    new_row = [new_source_text, translated_text]
-                    if context:
-                        new_row.append(context)
-                    updated_translations.append(new_row)
-                    updated = True
-                else:
-                    updated_translations.append(row)
-
-    if not updated:
-        frappe.throw(_("Translation for '{0}' not found in CSV").format(old_source_text))
-
-    # Write back to CSV
-    with open(file_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(updated_translations)
-
-    # Update database - delete old and insert new if source text changed
-    if old_source_text != new_source_text:
-        frappe.db.delete("Translation", {
-            "language": language_code,
-            "source_text": old_source_text
-        })
-
-    existing_db = frappe.db.get_value("Translation", {
-        "language": language_code,
-        "source_text": new_source_text
-    }, "name")
-
-    if existing_db:
-        frappe.db.set_value("Translation", existing_db, "translated_text", translated_text)
-    else:
-        frappe.db.sql("""
-            INSERT INTO `tabTranslation` (name, language, source_text, translated_text, context, creation, modified, owner, modified_by)
-            VALUES (%s, %s, %s, %s, %s, NOW(), NOW(), %s, %s)
-        """, (
-            frappe.generate_hash(length=10),
-            language_code,
-            new_source_text,
-            translated_text,
-            context,
-            frappe.session.user,
-            frappe.session.user
-        ))
-
-    frappe.db.commit()
+    with lock_translation_file(file_path, version):
+        # Find every row with the old source text, duplicates included
+        store = get_translation_store(file_path)
+        positions = store.find_all(old_source_text)
+
+        if not positions:
+            frappe.throw(_("Translation for '{0}' not found in CSV").format(old_source_text))
+
+        if any(position not in positions for position in store.find_all(new_source_text)):
+            frappe.throw(_("Translation for '{0}' already exists. Please edit it instead.").format(new_source_text))
+
+        # Make sure the file is backed up before modifying
+        get_session_backup(app_name, language_code, file_path, session_name)
+
+        # Update these rows with new source text
+        new_row = [new_source_text, translated_text]
+        if context:
+            new_row.append(context)
+
+        old_keys = {translation_key(store.get_row(position)) for position in positions}
+
+        # Rewrite only these rows' bytes in the CSV
+        store.apply_changes({position: new_row for position in positions})
+
+        # Update database - delete the old source text and contexts, insert the new one
+        for old_source, old_context in get_removed_keys(store, old_keys):
+            delete_translation_source(language_code, old_source, [old_context])
+
+        new_source, new_context = translation_key(new_row)
+        upsert_translation(language_code, new_source, translated_text, new_context)
+
+        frappe.db.commit()
+
+        # Taken under the lock, so it cannot cover a later write by someone else
+        new_version = get_file_version(file_path)
 
     # Clear caches
     settings = frappe.get_single("Translation Manager Settings")
     site_name = settings.default_site or frappe.local.site
-    execute_bench_commands(site_name, app_name, language_code, file_path)
+    execute_bench_commands(site_name, app_name, language_code)
 
     return {
         "success": True,
-        "message": _("Translation updated successfully")
+        "message": _("Translation updated successfully"),
+        "version": new_version
     }
 
 
 @frappe.whitelist()
-def delete_translation(app_name, language_code, source_text):
+def delete_translation(app_name, language_code, source_text, version=None, session_name=None):
     """Delete a translation from the CSV file and database"""
     check_translation_manager_permission()
 
@@ -862,44 +916,37 @@ def delete_translation(app_name, language_code, source_text):
     if not os.path.exists(file_path):
         frappe.throw(_("Translation file not found: {0}").format(file_path))
 
-    # Create backup before modifying
-    create_backup(app_name, language_code, file_path)
-
-    # Read existing translations and remove the matching one
-    deleted = False
-    updated_translations = []
-
-    with open(file_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 2:
-                if row[0].strip() == source_text.strip():
-                    deleted = True
-                    continue  # Skip this row (delete it)
-                updated_translations.append(row)
-
-    if not deleted:
-        frappe.throw(_("Translation for '{0}' not found in CSV").format(source_text))
-
-    # Write back to CSV
-    with open(file_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(updated_translations)
-
-    # Delete from database
-    frappe.db.delete("Translation", {
-        "language": language_code,
-        "source_text": source_text
-    })
+    with lock_translation_file(file_path, version):
+        # Find every row with this source text, duplicates included
+        store = get_translation_store(file_path)
+        positions = store.find_all(source_text)
+
+        if not positions:
+            frappe.throw(_("Translation for '{0}' not found in CSV").format(source_text))
+
+        # Make sure the file is backed up before modifying
+        get_session_backup(app_name, language_code, file_path, session_name)
+
+        contexts = {translation_key(store.get_row(position))[1] for position in positions}
+
+        # Cut only these rows' bytes out of the CSV
+        store.apply_changes({position: None for position in positions})
+
+        # Delete from database, other contexts of the source text are not in the file
+        delete_translation_source(language_code, source_text.strip(), list(contexts))
+
+        frappe.db.commit()
 
-    frappe.db.commit()
+        # Taken under the lock, so it cannot cover a later write by someone else
+        new_version = get_file_version(file_path)
 
     # Clear caches
     settings = frappe.get_single("Translation Manager Settings")
     site_name = settings.default_site or frappe.local.site
-    execute_bench_commands(site_name, app_name, language_code, file_path)
+    execute_bench_commands(site_name, app_name, language_code)
 
     return {
         "success": True,
-        "message": _("Translation deleted successfully")
+        "message": _("Translation deleted successfully"),
+        "version": new_version
     }
@@ -0,0 +1,227 @@
+"""
+Content-addressed store for translation file backups.
+
+A backup used to be a full copy of the CSV next to the original, taken on
+every edit. Backups now live in the site's private files as objects named
+after the SHA-256 of the file content, so identical states share one object
+and backing up an unchanged file writes nothing.
+
+An object is either a gzip snapshot of the whole file, or a gzip delta that
+lists the rows replaced relative to the latest snapshot of the same
+(app, language). A new snapshot is only taken when the delta would no longer
+be small compared to it. Reading an object replays its deltas down to the
+snapshot and checks the result against the hash. Objects are named after
+their hash only, so they are found without listing the store; a delta names
+its snapshot inside.
+"""
+
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import time
+
+import frappe
+from frappe import _
+
+from rustic_translator.csv_store import write_bytes
+
+# A delta is stored only while it is smaller than this share of its snapshot
+MAX_DELTA_RATIO = 0.25
+
+SNAPSHOT_SUFFIX = ".snapshot.gz"
+DELTA_SUFFIX = ".delta.gz"
+
+# Objects written this long before garbage collection starts are kept, their
+# backup may not be committed yet
+GC_GRACE_SECONDS = 60 * 60
+
+
+def get_store_path(*parts):
+    return frappe.get_site_path("private", "rustic_translator", "backups", *parts)
+
+
+def hash_content(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def split_records(data):
+    """Split CSV bytes into records, each with its \\r\\n terminator"""
+    records = [record + b"\r\n" for record in data.split(b"\r\n")]
+    records[-1] = records[-1][:-2]
+    if not records[-1]:
+        records.pop()
+    return records
+
+
+def get_object_path(content_hash):
+    """Return the path of the object holding content_hash, or None"""
+    for suffix in (SNAPSHOT_SUFFIX, DELTA_SUFFIX):
+        object_path = get_store_path("objects", content_hash + suffix)
+        if os.path.exists(object_path):
+            return object_path
+
+    return None
+
+
+def read_delta_base(object_path):
+    """Return the hash of the snapshot a delta object is based on"""
+    with open(object_path, "rb") as f:
+        return json.loads(gzip.decompress(f.read()))["base"]
+
+
+def get_keyframe(app_name, language_code):
+    """Return the hash of the snapshot new deltas of a file are taken against"""
+    ref_path = get_store_path("refs", app_name, language_code)
+    if not os.path.exists(ref_path):
+        return None
+
+    with open(ref_path) as f:
+        content_hash = f.read().strip()
+
+    return content_hash if get_object_path(content_hash) else None
+
+
+def make_delta(base, data):
+    """Return [[start, end, replacement], ...] turning the records of base into data"""
+    old = split_records(base)
+    new = split_records(data)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+
+    return [
+        [i1, i2, b"".join(new[j1:j2]).decode("utf-8", "surrogateescape")]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_delta(base, ops):
+    records = split_records(base)
+    parts = []
+    position = 0
+    for start, end, replacement in ops:
+        parts.extend(records[position:start])
+        parts.append(replacement.encode("utf-8", "surrogateescape"))
+        position = end
+    parts.extend(records[position:])
+    return b"".join(parts)
+
+
+def store_backup(app_name, language_code, file_path):
+    """
+    Store the current state of a translation file and return its content hash
+    - An already stored state is not written again
+    - Otherwise a delta against the latest snapshot is written while it stays small
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    content_hash = hash_content(data)
+    object_path = get_object_path(content_hash)
+    if object_path:
+        # Referenced again, so garbage collection gives it the same grace as a new object
+        os.utime(object_path)
+        return content_hash
+
+    objects_path = get_store_path("objects")
+    os.makedirs(objects_path, exist_ok=True)
+
+    keyframe = get_keyframe(app_name, language_code)
+
+    if keyframe:
+        delta = gzip.compress(json.dumps(
+            {"base": keyframe, "ops": make_delta(read_backup(keyframe), data)}
+        ).encode("utf-8"))
+
+        if len(delta) < os.path.getsize(get_object_path(keyframe)) * MAX_DELTA_RATIO:
+            write_bytes(os.path.join(objects_path, content_hash + DELTA_SUFFIX), delta)
+            return content_hash
+
+    write_bytes(os.path.join(objects_path, content_hash + SNAPSHOT_SUFFIX), gzip.compress(data))
+
+    refs_path = get_store_path("refs", app_name)
+    os.makedirs(refs_path, exist_ok=True)
+    write_bytes(os.path.join(refs_path, language_code), content_hash.encode("utf-8"))
+
+    return content_hash
+
+
+def read_backup(content_hash):
+    """Return the file content stored under content_hash, replaying deltas"""
+    object_path = get_object_path(content_hash)
+    if not object_path:
+        frappe.throw(_("Backup {0} not found in the backup store").format(content_hash))
+
+    with open(object_path, "rb") as f:
+        stored = gzip.decompress(f.read())
+
+    if object_path.endswith(SNAPSHOT_SUFFIX):
+        data = stored
+    else:
+        delta = json.loads(stored)
+        data = apply_delta(read_backup(delta["base"]), delta["ops"])
+
+    if hash_content(data) != content_hash:
+        frappe.throw(_("Backup {0} is corrupted").format(content_hash))
+
+    return data
+
+
+def restore_backup(content_hash, file_path):
+    """Atomically replace a translation file with a stored state"""
+    write_bytes(file_path, read_backup(content_hash))
+
+
+def collect_garbage(referenced, started_at=None):
+    """
+    Delete objects no backup refers to
+    - Snapshots that referenced deltas or current keyframes are based on are kept
+    - started_at is when referenced was read; objects written since, or within
+      GC_GRACE_SECONDS before, are kept, and so are files still being written
+    """
+    objects_path = get_store_path("objects")
+    if not os.path.isdir(objects_path):
+        return 0
+
+    keep = set(referenced)
+
+    refs_path = get_store_path("refs")
+    for root, _dirs, files in os.walk(refs_path):
+        for filename in files:
+            with open(os.path.join(root, filename)) as f:
+                keep.add(f.read().strip())
+
+    for content_hash in list(keep):
+        object_path = get_object_path(content_hash)
+        if object_path and object_path.endswith(DELTA_SUFFIX):
+            keep.add(read_delta_base(object_path))
+
+    cutoff = (started_at if started_at is not None else time.time()) - GC_GRACE_SECONDS
+
+    removed = 0
+    for filename in os.listdir(objects_path):
+        # Temporary files of write_bytes, see csv_store._replace_atomically
+        if filename.startswith(".") or filename.endswith(".tmp"):
+            continue
+
+        object_path = os.path.join(objects_path, filename)
+        if filename.split(".")[0] in keep or os.path.getmtime(object_path) >= cutoff:
+            continue
+
+        os.remove(object_path)
+        removed += 1
+
+    return removed
+
+
+def after_migrate():
+    """Rename deltas of older versions, named {hash}.{base}.delta.gz, to {hash}.delta.gz"""
+    objects_path = get_store_path("objects")
+    if not os.path.isdir(objects_path):
+        return
+
+    for filename in os.listdir(objects_path):
+        parts = filename.split(".")
+        if filename.endswith(DELTA_SUFFIX) and len(parts) == 4 and not filename.startswith("."):
+            os.replace(os.path.join(objects_path, filename), os.path.join(objects_path, parts[0] + DELTA_SUFFIX))
@@ -0,0 +1,182 @@
+"""
+Targeted invalidation of Frappe's translation caches.
+
+Frappe caches translations per language: the messages read from every app's
+CSV files, the user translations from tabTranslation, the merged dictionary
+of both, and a copy of the merged messages inside each user's boot info.
+An edit to one (app, language) file only affects those entries for that
+language, so only they are deleted - no pattern scans over Redis and no
+site-wide frappe.clear_cache().
+
+After a save the merged dictionary is refreshed stale-while-revalidate: the
+old dictionary keeps being served while a background job rebuilds it from
+the already invalidated app and user translations and swaps it in, so users
+of that language never pay for the rebuild in their own request. The stale
+dictionary is only kept while a worker serves the queue of that job, and the
+job drops it when the rebuild fails, so an edit always shows up eventually.
+
+Every invalidation bumps a generation counter of the language and queues a
+job for that generation. A job whose generation is no longer current skips
+the rebuild, the later job does it; a job whose language was invalidated
+while it was rebuilding drops what it stored, as that may miss the edit.
+"""
+
+import frappe
+from frappe.translate import get_translations_from_apps, get_user_translations
+from frappe.utils import cint
+from frappe.utils.background_jobs import get_queue, get_workers
+
+# Redis hashes keyed by language code: (name, shared across sites)
+LANGUAGE_HASHES = (
+    ("merged_translations", False),
+    ("translations_from_apps", False),
+    ("lang_user_translations", False),
+    ("lang_full_dict", False),
+    ("translation_assets", False),
+    ("translation_assets", True),
+)
+
+# Sources of the merged dictionary, rebuilt on the next read
+SOURCE_HASHES = ("translations_from_apps", "lang_user_translations")
+
+MERGED_HASH = "merged_translations"
+
+WARM_UP_QUEUE = "short"
+
+REALTIME_EVENT = "rustic_translator_translations_updated"
+
+GENERATION_KEY = "rustic_translator_translation_generation"
+
+
+def get_cache_keys(app_name, language_code):
+    """Return the (hash, field, shared) cache entries that depend on an app's language file"""
+    # Translations are merged across apps, so every app maps to the same entries
+    return [(name, language_code, shared) for name, shared in LANGUAGE_HASHES]
+
+
+def get_users_with_language(language_code):
+    """Return users whose desk runs in the given language"""
+    users = frappe.get_all("User", filters={"language": language_code}, pluck="name")
+
+    # Users without a language fall back to the system default
+    if (frappe.db.get_default("lang") or "en") == language_code:
+        users += frappe.get_all("User", filters={"language": ["is", "not set"]}, pluck="name")
+
+    return users
+
+
+def get_generation_key(language_code):
+    return frappe.cache().make_key(f"{GENERATION_KEY}:{language_code}")
+
+
+def get_generation(language_code):
+    """Return the invalidation count of a language, read from Redis past the request cache"""
+    return cint(frappe.cache().get(get_generation_key(language_code)))
+
+
+def _clear_derived_entries(app_name, language_code):
+    """Drop every entry derived from the merged dictionary of a language"""
+    cache = frappe.cache()
+
+    for name, field, shared in get_cache_keys(app_name, language_code):
+        if name != MERGED_HASH and name not in SOURCE_HASHES:
+            cache.hdel(name, field, shared=shared)
+
+    for user in get_users_with_language(language_code):
+        cache.hdel("bootinfo", user)
+
+
+def invalidate_translation_cache(app_name, language_code, notify=True, warm=False):
+    """
+    Delete only the cached translations that depend on (app_name, language_code)
+    - Drops the language's entries from the translation hashes
+    - Drops boot info of the users working in that language
+    - With warm, the stale merged dictionary is kept and a background job
+      replaces it with a rebuilt one
+    - Publishes a realtime event so open desks know the translations changed
+    """
+    cache = frappe.cache()
+
+    # Rebuilds already running for the language are outdated from here on
+    generation = cache.incr(get_generation_key(language_code))
+
+    for name in SOURCE_HASHES:
+        cache.hdel(name, language_code)
+
+    if not (warm and enqueue_warm_up(language_code, generation)):
+        cache.hdel(MERGED_HASH, language_code)
+        _clear_derived_entries(app_name, language_code)
+
+    # Translations already loaded for the current request
+    if getattr(frappe.local, "lang", None) == language_code:
+        frappe.local.lang_full_dict = None
+
+    if notify:
+        frappe.publish_realtime(
+            REALTIME_EVENT,
+            {"app_name": app_name, "language_code": language_code, "user": frappe.session.user},
+            after_commit=True,
+        )
+
+
+def has_warm_up_worker():
+    """Return whether a worker listens on the queue the rebuild runs on"""
+    try:
+        return bool(get_workers(get_queue(WARM_UP_QUEUE)))
+    except Exception:
+        return False
+
+
+def enqueue_warm_up(language_code, generation):
+    """
+    Queue the rebuild of a language's merged dictionary for one generation
+    - Not deduplicated: a job already running may read the translations from
+      before this invalidation, so every generation gets its own job
+    - Returns False if it could not be queued, or no worker would run it
+    """
+    if not has_warm_up_worker():
+        return False
+
+    try:
+        frappe.enqueue(
+            "rustic_translator.cache_invalidation.warm_translation_cache",
+            queue=WARM_UP_QUEUE,
+            enqueue_after_commit=True,
+            language_code=language_code,
+            generation=generation,
+        )
+    except Exception:
+        frappe.log_error(title="Translation Cache Warm-up Error")
+        return False
+
+    return True
+
+
+def warm_translation_cache(language_code, generation):
+    """
+    Rebuild the merged dictionary of a language and swap it in
+    - Skipped when a later invalidation queued a job of its own
+    - App and user translations are read fresh, they were invalidated on save
+    - Entries derived from the merged dictionary are dropped only afterwards,
+      so they are rebuilt from the new one
+    - When the rebuild fails, or the language was invalidated again while it
+      ran, the entries are dropped all the same, the next read rebuilds them
+    """
+    if get_generation(language_code) != generation:
+        return
+
+    try:
+        translations = get_translations_from_apps(language_code).copy()
+        translations.update(get_user_translations(language_code))
+    except Exception:
+        frappe.cache().hdel(MERGED_HASH, language_code)
+        _clear_derived_entries(None, language_code)
+        raise
+
+    frappe.cache().hset(MERGED_HASH, language_code, translations)
+
+    # Checked after storing, so an invalidation in between is always seen
+    if get_generation(language_code) != generation:
+        frappe.cache().hdel(MERGED_HASH, language_code)
+
+    _clear_derived_entries(None, language_code)
@@ -0,0 +1,44 @@
+"""
+Bench commands of rustic_translator.
+
+    bench --site rustic.works translation-coverage --language ar
+    bench --site rustic.works translation-coverage --language ar --app erpnext --missing 50 --start 100
+"""
+
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("translation-coverage")
+@click.option("--language", required=True, help="Language code, e.g. ar")
+@click.option("--app", help="Only report this app")
+@click.option("--missing", default=20, show_default=True, help="Number of missing strings to list")
+@click.option("--start", default=0, show_default=True, help="Offset into the missing strings")
+@pass_context
+def translation_coverage(context, language, app=None, missing=20, start=0):
+    """Show how much of the apps' translatable strings a language covers"""
+    from rustic_translator.coverage import get_coverage
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+    try:
+        coverage = get_coverage(language, app, start, missing, build_index=True)
+    finally:
+        frappe.destroy()
+
+    for counts in coverage["apps"]:
+        click.echo(
+            f"{counts['app_name']}: {counts['percentage']}% "
+            f"({counts['translated']} of {counts['total']} translated, {counts['missing']} missing)"
+        )
+    click.echo(f"Total: {coverage['percentage']}% ({coverage['translated']} of {coverage['total']})")
+
+    if coverage["missing"]:
+        end = start + len(coverage["missing"])
+        click.echo(f"\nMissing {start + 1}-{end} of {coverage['missing_count']}:")
+        for entry in coverage["missing"]:
+            click.echo(f"  {entry['source_text']}  ({entry['location']})")
+
+
+commands = [translation_coverage]
@@ -0,0 +1,122 @@
+"""
+Translation coverage of the allowed apps per language.
+
+The translatable strings of every app come from the source string index.
+They are diffed against the translations/<language>.csv files of all allowed
+apps, merged the way Frappe merges them at runtime, so a string counts as
+translated when any of the files has a non-empty translation for it.
+
+A report depends only on the index and the CSV files, so it is cached under
+the index signature and the content hash of the CSV files, and only
+recomputed when one of them changed.
+"""
+
+import frappe
+
+from rustic_translator.file_cache import get_translation_file, normalize_source
+from rustic_translator.setup_translations import get_csv_fingerprint, get_translation_files
+from rustic_translator.source_index import get_index_signature, get_strings, refresh_index
+
+# Seconds a computed report stays cached
+REPORT_TTL = 24 * 60 * 60
+
+
+def get_translated_sources(csv_paths):
+    """Return the normalized source texts that have a translation in any of the files"""
+    translated = set()
+    for csv_path in csv_paths:
+        for _position, row in get_translation_file(csv_path).iter_translations():
+            if len(row) > 1 and row[1].strip():
+                translated.add(normalize_source(row[0]))
+    return translated
+
+
+def build_report(language_code, strings, csv_paths):
+    """
+    Return the coverage of one language
+    - apps lists total, translated, missing and percentage per app
+    - missing lists {source_text, app_name, location} sorted by app and text
+    """
+    translated = get_translated_sources(csv_paths)
+
+    apps = {}
+    missing = []
+    for text, locations in strings.items():
+        for app_name in dict.fromkeys(app_name for app_name, _location in locations):
+            counts = apps.setdefault(app_name, {"app_name": app_name, "total": 0, "translated": 0})
+            counts["total"] += 1
+
+            if text in translated:
+                counts["translated"] += 1
+            else:
+                location = next(location for name, location in locations if name == app_name)
+                missing.append({"source_text": text, "app_name": app_name, "location": location})
+
+    for counts in apps.values():
+        counts["missing"] = counts["total"] - counts["translated"]
+        counts["percentage"] = round(100.0 * counts["translated"] / counts["total"], 2) if counts["total"] else 100.0
+
+    missing.sort(key=lambda entry: (entry["app_name"], entry["source_text"]))
+
+    return {
+        "language_code": language_code,
+        "apps": sorted(apps.values(), key=lambda counts: counts["app_name"]),
+        "missing": missing
+    }
+
+
+def get_report(language_code, build_index=False):
+    """
+    Return the cached coverage report of a language, recomputing it when stale
+    - Returns None while there is no source string index, unless build_index
+      is set, in which case it is built first
+    """
+    signature = get_index_signature()
+    if signature is None:
+        if not build_index:
+            return None
+        refresh_index()
+        signature = get_index_signature()
+
+    csv_paths = get_translation_files().get(language_code, [])
+    cache_key = "rustic_translator_coverage:{}:{}:{}".format(
+        language_code, "-".join(str(part) for part in signature), get_csv_fingerprint(csv_paths)
+    )
+
+    report = frappe.cache().get_value(cache_key)
+    if report is None:
+        report = build_report(language_code, get_strings(signature), csv_paths)
+        frappe.cache().set_value(cache_key, report, expires_in_sec=REPORT_TTL)
+
+    return report
+
+
+def get_coverage(language_code, app_name=None, start=0, page_length=100, build_index=False):
+    """
+    Return coverage percentages and one page of the missing strings of a language
+    - app_name limits both to a single app
+    """
+    report = get_report(language_code, build_index)
+    if report is None:
+        return None
+
+    apps = report["apps"]
+    missing = report["missing"]
+    if app_name:
+        apps = [counts for counts in apps if counts["app_name"] == app_name]
+        missing = [entry for entry in missing if entry["app_name"] == app_name]
+
+    total = sum(counts["total"] for counts in apps)
+    translated = sum(counts["translated"] for counts in apps)
+
+    return {
+        "language_code": language_code,
+        "total": total,
+        "translated": translated,
+        "percentage": round(100.0 * translated / total, 2) if total else 100.0,
+        "apps": apps,
+        "missing_count": len(missing),
+        "missing": missing[start:start + page_length],
+        "start": start,
+        "page_length": page_length
+    }
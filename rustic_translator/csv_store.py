@@ -0,0 +1,237 @@
+"""
+Storage engine for translation CSV files.
+
+Single-row edits used to rebuild the whole row list and rewrite the file with
+csv.writer. The parsed-file cache already knows the byte range of every row,
+so an edit only has to encode the rows that changed: the new file is produced
+by streaming the untouched bytes before, between and after the changed rows
+into a temp file next to the original, which then atomically replaces it.
+Nothing outside the changed rows is parsed or re-encoded.
+
+Every write replaces the file atomically, so readers never see a partial
+file. Writers serialize their read-modify-write cycles with lock_file, an
+flock that is shared by all workers and sites on the host.
+"""
+
+import contextlib
+import csv
+import fcntl
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from rustic_translator.file_cache import encode_row, get_translation_file, invalidate, touch
+
+# Chunk size for streaming unchanged bytes between the old and new file
+BLOCK_SIZE = 1024 * 1024
+
+# Seconds to wait for another writer of the same file
+LOCK_TIMEOUT = 30
+
+# Lock files held by the current thread, so nested lock_file calls pass through
+_held_locks = threading.local()
+
+
+class FileLockTimeout(Exception):
+    """Another writer kept a translation file locked for longer than the timeout"""
+
+
+def get_lock_path(file_path):
+    """Return the lock file of a CSV, kept outside the app so it never shows up in git"""
+    digest = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"rustic_translator-{digest}.lock")
+
+
+@contextlib.contextmanager
+def lock_file(file_path, timeout=LOCK_TIMEOUT):
+    """
+    Hold the exclusive write lock of a translation CSV
+    - The CSV itself is replaced on every write, so a separate lock file is flocked
+    - Raises FileLockTimeout when the lock is not free within timeout seconds
+    """
+    lock_path = get_lock_path(file_path)
+    held = _held_locks.__dict__.setdefault("paths", set())
+    if lock_path in held:
+        yield
+        return
+
+    with open(lock_path, "a") as f:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise FileLockTimeout(file_path)
+                time.sleep(0.05)
+
+        held.add(lock_path)
+        try:
+            yield
+        finally:
+            held.discard(lock_path)
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _copy_bytes(src, dst, length):
+    while length > 0:
+        chunk = src.read(min(BLOCK_SIZE, length))
+        if not chunk:
+            break
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def _replace_atomically(file_path, write):
+    """Call write(f) on a temp file in the same directory, then swap it into place"""
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=os.path.dirname(file_path)
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def splice_file(file_path, patches):
+    """
+    Replace byte ranges of a file
+    - patches is a list of (start, end, data) with non-overlapping ranges
+    - Bytes outside the ranges are block-copied without being decoded
+    """
+    def write(dst):
+        with open(file_path, "rb") as src:
+            position = 0
+            for start, end, data in sorted(patches, key=lambda patch: patch[0]):
+                _copy_bytes(src, dst, start - position)
+                dst.write(data)
+                src.seek(end)
+                position = end
+            shutil.copyfileobj(src, dst, BLOCK_SIZE)
+
+    _replace_atomically(file_path, write)
+
+
+def copy_file(src_path, file_path):
+    """Atomically replace a translation CSV with a copy of another file"""
+    def write(dst):
+        with open(src_path, "rb") as src:
+            shutil.copyfileobj(src, dst, BLOCK_SIZE)
+
+    _replace_atomically(file_path, write)
+
+
+def write_bytes(file_path, data):
+    """Atomically replace a file with the given bytes"""
+    _replace_atomically(file_path, lambda f: f.write(data))
+
+
+def write_rows(file_path, rows):
+    """Atomically replace a translation CSV with the given rows"""
+    def write(f):
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="", write_through=True)
+        csv.writer(text).writerows(rows)
+        text.detach()
+
+    _replace_atomically(file_path, write)
+
+
+class CSVTranslationStore:
+    """Row level reads and writes against one translation CSV"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = get_translation_file(file_path)
+
+    @property
+    def version(self):
+        return self.file.version
+
+    def find(self, source_text):
+        """Return the position of the first row for source_text, or None"""
+        return self.file.find(source_text)
+
+    def find_all(self, source_text):
+        """Return the positions of every row for source_text, in file order"""
+        return self.file.find_all(source_text)
+
+    def get_row(self, position):
+        return self.file.rows[position]
+
+    def search(self, query=None, empty_only=False, start=0, page_length=None):
+        """Return ([(position, row), ...], filtered_count, total_count, empty_count) for one page"""
+        search_index = self.file.search_index
+
+        # Substring search on folded text, see search_index
+        positions = search_index.search(query)
+        if empty_only:
+            positions = [position for position in positions if position in search_index.empty]
+
+        end = len(positions) if page_length is None else start + page_length
+        page = [(position, self.file.rows[position]) for position in positions[start:end]]
+
+        return page, len(positions), search_index.total, len(search_index.empty)
+
+    def append_row(self, row):
+        """Append a row after the last one, without re-encoding the rest of the file"""
+        data = encode_row(row)
+        leading = b""
+
+        with open(self.file_path, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            if end:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Terminate the last row first so the new one starts on its own line
+                    leading = b"\r\n"
+
+        splice_file(self.file_path, [(end, end, leading + data)])
+
+        position = self.file.append_row(row, leading=len(leading))
+        touch(self.file)
+        return position
+
+    def replace_row(self, position, row):
+        """Rewrite the byte range of a single row"""
+        self.apply_changes({position: row})
+
+    def delete_row(self, position):
+        """Cut the byte range of a single row out of the file"""
+        self.apply_changes({position: None})
+
+    def apply_changes(self, changes):
+        """
+        Apply {position: row} to the file in one pass
+        - A row of None deletes the row at that position
+        """
+        patches = []
+        for position, row in changes.items():
+            start, end = self.file.get_span(position)
+            patches.append((start, end, encode_row(row) if row is not None else b""))
+
+        splice_file(self.file_path, patches)
+
+        if any(row is None for row in changes.values()):
+            # A fresh parse numbers the rows after a deleted one differently,
+            # and positions are row ids for the editor, so every worker has
+            # to number them the same way: drop the entry and parse again
+            invalidate(self.file_path)
+            self.file = get_translation_file(self.file_path)
+            return
+
+        for position, row in changes.items():
+            self.file.replace_row(position, row)
+        touch(self.file)
@@ -1,43 +1,118 @@
 """
-Export Arabic translations from Translation DocType back to ar.csv.
+Export translations from Translation DocType back to translations/<language>.csv.
 
 Usage (from bench directory):
     bench --site rustic.works execute rustic_translator.export_translations.export
+    bench --site rustic.works execute rustic_translator.export_translations.export --kwargs "{'language': 'ar', 'app': 'erpnext'}"
+    bench --site rustic.works execute rustic_translator.export_translations.export --kwargs "{'language': 'ar', 'output_path': '/tmp/ar.csv'}"
 
-This keeps ar.csv in sync with translations edited via the website UI.
-After running, commit and push the updated ar.csv.
+Without a language, every language the target app already ships a
+translations/<language>.csv for is exported, in parallel worker threads. The
+target app is this app unless app is given, so files are only ever created in
+another app's directory, or outside the apps, when app or output_path says so.
+
+Rows are streamed from an unbuffered cursor into a temp file next to the
+target, which then atomically replaces it, so memory use does not grow with
+the size of tabTranslation and readers never see a half-written file.
+
+This keeps the CSV files in sync with translations edited via the website UI.
+After running, commit and push the updated CSV files.
 """
 
-import csv
+import contextlib
 import os
+from itertools import islice
 
 import frappe
 
+from rustic_translator.csv_store import write_rows
+from rustic_translator.setup_translations import run_per_language
 
-def export():
-    """Export all Arabic translations from DB to translations/ar.csv."""
-    translations = frappe.db.sql(
-        """
-        SELECT source_text, translated_text
-        FROM tabTranslation
-        WHERE language = 'ar'
-          AND source_text IS NOT NULL
-          AND source_text != ''
-          AND translated_text IS NOT NULL
-          AND translated_text != ''
-        ORDER BY source_text
-        """,
-        as_dict=True,
-    )
+APP_NAME = "rustic_translator"
+
+# Rows fetched from the cursor and written per step
+CHUNK_SIZE = 1000
+
+
+def get_export_path(language, app=None):
+    """Return the path of an app's CSV for a language, defaulting to this app."""
+    return frappe.get_app_path(app or APP_NAME, "translations", f"{language}.csv")
 
-    csv_path = os.path.join(
-        os.path.dirname(__file__),
-        "translations", "ar.csv",
+
+def get_shipped_languages(app=None):
+    """Return the languages an app, defaulting to this app, has a translations/*.csv for."""
+    translations_path = frappe.get_app_path(app or APP_NAME, "translations")
+    if not os.path.isdir(translations_path):
+        return []
+
+    return sorted(
+        filename[:-4]
+        for filename in os.listdir(translations_path)
+        if filename.endswith(".csv") and not filename.startswith(".")
     )
 
-    with open(csv_path, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        for t in translations:
-            writer.writerow([t.source_text, t.translated_text])
 
-    print(f"Exported {len(translations)} translations to {csv_path}")
+def iter_translation_rows(language):
+    """Yield [source_text, translated_text(, context)] rows of a language in chunks."""
+    # A server-side cursor keeps the result set in the database instead of
+    # buffering it all in the client
+    unbuffered_cursor = getattr(frappe.db, "unbuffered_cursor", contextlib.nullcontext)
+
+    with unbuffered_cursor():
+        rows = frappe.db.sql(
+            """
+            SELECT source_text, translated_text, context
+            FROM tabTranslation
+            WHERE language = %s
+              AND source_text IS NOT NULL
+              AND source_text != ''
+              AND translated_text IS NOT NULL
+              AND translated_text != ''
+            ORDER BY source_text
+            """,
+            (language,),
+            as_iterator=True,
+        )
+
+        while True:
+            chunk = list(islice(rows, CHUNK_SIZE))
+            if not chunk:
+                break
+            for source_text, translated_text, context in chunk:
+                yield [source_text, translated_text, context] if context else [source_text, translated_text]
+
+
+def export_language(language, app=None, output_path=None):
+    """Export all translations of one language from DB to a CSV file."""
+    csv_path = output_path or get_export_path(language, app)
+    os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+
+    count = 0
+
+    def counted(rows):
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    write_rows(csv_path, counted(iter_translation_rows(language)))
+
+    return {"count": count, "path": csv_path}
+
+
+def export(language=None, app=None, output_path=None):
+    """Export translations from DB to translations/<language>.csv."""
+    if output_path and not language:
+        frappe.throw("An output path can only be used when exporting a single language")
+
+    languages = [language] if language else get_shipped_languages(app)
+    if not languages:
+        print(f"No translations/*.csv in {app or APP_NAME}, pass a language to export one")
+        return
+
+    results = run_per_language(
+        export_language, {lang: (app, output_path) for lang in languages}
+    )
+
+    for lang, result in sorted(results.items()):
+        print(f"Exported {result['count']} {lang} translations to {result['path']}")
@@ -0,0 +1,311 @@
+"""
+In-process cache of parsed translation CSV files.
+
+Parsing a language file (23k rows for ar.csv) on every API call dominates the
+cost of single-row edits. Each file is parsed once per worker and re-used for
+as long as its (mtime, size, inode) signature on disk is unchanged. Writes made
+through the API update the cached entry in place so the next call does not
+have to re-parse the file it just wrote.
+
+Every entry also carries an index from normalized source text to the
+positions of its rows (a source text may appear more than once) and the byte
+offset of every row in the file. Both are maintained
+incrementally by the single-row edits, so lookups and duplicate checks are
+dictionary hits. Positions are the row ids of the editor, so every worker
+must number a file the same way: an entry always numbers its rows as a fresh
+parse of the file would, and deleting a row drops the entry instead of
+updating it.
+
+The folded text used by the editor's search is kept per entry as well, see
+search_index. It is only built when the file is first searched, and the
+single-row edits keep it up to date too.
+
+Entries are evicted least-recently-used first once their combined memory
+exceeds MAX_CACHE_MEMORY. The memory of an entry is estimated from the size
+of its file on disk, scaled by factors measured on ar.csv: the parsed rows,
+index and offsets take about 5 times the size of the CSV, and the search
+index another 5 times once it was built.
+"""
+
+import bisect
+import csv
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from rustic_translator.search_index import SearchIndex
+
+# Budget for all cached files, measured as estimated bytes of memory
+MAX_CACHE_MEMORY = 128 * 1024 * 1024
+
+# Estimated bytes of memory per byte of CSV, for the parsed file and its search index
+ROWS_MEMORY_FACTOR = 5
+SEARCH_MEMORY_FACTOR = 5
+
+# Pending offset shifts are folded into the offset table past this many
+MAX_PENDING_SHIFTS = 64
+
+_entries = OrderedDict()
+_lock = threading.RLock()
+
+
+def get_file_signature(file_path):
+    """Return the (mtime, size, inode) triple used to detect changes on disk"""
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def get_file_version(file_path):
+    """Return a token that changes whenever the file changes on disk"""
+    return format_version(get_file_signature(file_path))
+
+
+def format_version(signature):
+    return "-".join(str(part) for part in signature)
+
+
+def normalize_source(source_text):
+    """Return the key a source text is indexed under"""
+    return (source_text or "").strip()
+
+
+def translation_key(row):
+    """Return the (source_text, context) pair a row is stored under in tabTranslation"""
+    return row[0].strip(), ((row[2].strip() or None) if len(row) > 2 else None)
+
+
+def encode_row(row):
+    """Return a row exactly as csv.writer writes it to disk"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue().encode("utf-8")
+
+
+class TranslationFile:
+    """Parsed rows of one translation CSV with a source text index and row offsets"""
+
+    def __init__(self, file_path, rows, offsets, signature):
+        self.file_path = file_path
+        self.rows = rows
+        self.signature = signature
+        # offsets[i] is where row i starts, offsets[-1] is the end of the file
+        self._offsets = offsets
+        # (position, delta) pairs not yet applied to rows after position
+        self._shifts = []
+        self._search_index = None
+        self._build_index()
+
+    @property
+    def size(self):
+        return self.signature[1]
+
+    @property
+    def memory(self):
+        """Estimated bytes of memory held by this entry"""
+        factor = ROWS_MEMORY_FACTOR
+        if self._search_index is not None:
+            factor += SEARCH_MEMORY_FACTOR
+        return self.size * factor
+
+    @property
+    def version(self):
+        """Version token of the file state these rows were parsed from"""
+        return format_version(self.signature)
+
+    @property
+    def search_index(self):
+        """Folded search text and empty translations of the rows, built on first use"""
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.rows)
+            # The entry just grew, which may push the cache over its budget
+            with _lock:
+                _evict()
+        return self._search_index
+
+    def _build_index(self):
+        # Normalized source text -> positions of its rows, in file order
+        self.index = {}
+        for idx, row in enumerate(self.rows):
+            if row and len(row) >= 2:
+                self.index.setdefault(normalize_source(row[0]), []).append(idx)
+
+    def iter_translations(self):
+        """Yield (position, row) for every row with a source and a translation column"""
+        for idx, row in enumerate(self.rows):
+            if row and len(row) >= 2:
+                yield idx, row
+
+    def find(self, source_text):
+        """Return the position of the first row for source_text, or None if it is not in the file"""
+        positions = self.index.get(normalize_source(source_text))
+        return positions[0] if positions else None
+
+    def find_all(self, source_text):
+        """Return the positions of every row for source_text, in file order"""
+        return list(self.index.get(normalize_source(source_text), ()))
+
+    def get_offset(self, position):
+        """Return the byte offset at which the row at position starts"""
+        offset = self._offsets[position]
+        for at, delta in self._shifts:
+            if at < position:
+                offset += delta
+        return offset
+
+    def get_span(self, position):
+        """Return the (start, end) byte range of the row at position"""
+        return self.get_offset(position), self.get_offset(position + 1)
+
+    def replace_row(self, position, row):
+        """Record that the row at position was rewritten on disk"""
+        row = tuple(row)
+        start, end = self.get_span(position)
+        self._unindex(position)
+        self.rows[position] = row
+        self._index_row(position)
+        self._update_search(position)
+        self._shift(position, len(encode_row(row)) - (end - start))
+
+    def append_row(self, row, leading=0):
+        """
+        Record that a row was appended to the file on disk
+        - leading is the number of bytes written to terminate the previous last row
+        """
+        row = tuple(row)
+        position = len(self.rows)
+        if leading:
+            self._shift(position - 1, leading)
+        self.rows.append(row)
+        self._offsets.append(self._offsets[position] + len(encode_row(row)))
+        self._index_row(position)
+        self._update_search(position)
+        return position
+
+    def _update_search(self, position):
+        if self._search_index is not None:
+            self._search_index.update(position, self.rows[position])
+
+    def _index_row(self, position):
+        row = self.rows[position]
+        if row and len(row) >= 2:
+            bisect.insort(self.index.setdefault(normalize_source(row[0]), []), position)
+
+    def _unindex(self, position):
+        row = self.rows[position]
+        if not row or len(row) < 2:
+            return
+
+        key = normalize_source(row[0])
+        positions = self.index.get(key, [])
+        if position in positions:
+            positions.remove(position)
+            if not positions:
+                del self.index[key]
+
+    def _shift(self, position, delta):
+        if delta:
+            self._shifts.append((position, delta))
+        if len(self._shifts) > MAX_PENDING_SHIFTS:
+            self._offsets = [self.get_offset(idx) for idx in range(len(self._offsets))]
+            self._shifts = []
+
+
+def iter_records(file_path):
+    """Yield (row, end_offset) for every record of a translation CSV, one at a time"""
+    position = 0
+
+    def lines(f):
+        nonlocal position
+        for line in f:
+            position += len(line)
+            yield line.decode("utf-8")
+
+    with open(file_path, "rb") as f:
+        # csv.reader only pulls the lines a record needs, so after each record
+        # the running position is exactly where the next one starts
+        for row in csv.reader(lines(f)):
+            yield tuple(row), position
+
+
+def read_file(file_path):
+    """Parse a translation CSV into row tuples and the byte offset of each row"""
+    rows = []
+    offsets = [0]
+    for row, end in iter_records(file_path):
+        rows.append(row)
+        offsets.append(end)
+    return rows, offsets
+
+
+def iter_translation_rows(file_path):
+    """
+    Yield (source_text, translated_text, context) for every translated row, stripped
+    - Rows of a cached, current entry are read from the cache; otherwise the
+      file is streamed without being cached, so memory does not grow with it
+    """
+    with _lock:
+        entry = _entries.get(file_path)
+        if entry is not None and entry.signature != get_file_signature(file_path):
+            entry = None
+
+    rows = entry.rows if entry is not None else (row for row, _end in iter_records(file_path))
+    for row in rows:
+        if not row or len(row) < 2:
+            continue
+
+        source_text, context = translation_key(row)
+        translated_text = row[1].strip()
+        if source_text and translated_text:
+            yield source_text, translated_text, context
+
+
+def get_translation_keys(file_path):
+    """Return the (source_text, context) pairs of every translated row"""
+    return {(source_text, context) for source_text, _translated_text, context in iter_translation_rows(file_path)}
+
+
+def get_translation_file(file_path):
+    """Return the parsed file, re-reading it only if it changed on disk"""
+    with _lock:
+        # Stat before reading so a concurrent write leaves a stale signature,
+        # which only forces an extra parse on the next call
+        signature = get_file_signature(file_path)
+        entry = _entries.get(file_path)
+        if entry is not None and entry.signature == signature:
+            _entries.move_to_end(file_path)
+            return entry
+
+        rows, offsets = read_file(file_path)
+        return _put(TranslationFile(file_path, rows, offsets, signature))
+
+
+def touch(entry):
+    """Accept the current state on disk as the result of our own edit to entry"""
+    with _lock:
+        entry.signature = get_file_signature(entry.file_path)
+        return _put(entry)
+
+
+def invalidate(file_path=None):
+    """Drop one file, or every file, from the cache"""
+    with _lock:
+        if file_path is None:
+            _entries.clear()
+        else:
+            _entries.pop(file_path, None)
+
+
+def _put(entry):
+    _entries[entry.file_path] = entry
+    _entries.move_to_end(entry.file_path)
+    _evict()
+    return entry
+
+
+def _evict():
+    # Evict least recently used files, but always keep the most recent one
+    total = sum(e.memory for e in _entries.values())
+    while total > MAX_CACHE_MEMORY and len(_entries) > 1:
+        _, evicted = _entries.popitem(last=False)
+        total -= evicted.memory
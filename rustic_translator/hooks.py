@@ -138,23 +138,11 @@ page_js = {"translation-editor": "public/js/translation_editor.js"}
 # Scheduled Tasks
 # ---------------
 
-# scheduler_events = {
-#	"all": [
-#		"rustic_translator.tasks.all"
-#	],
-#	"daily": [
-#		"rustic_translator.tasks.daily"
-#	],
-#	"hourly": [
-#		"rustic_translator.tasks.hourly"
-#	],
-#	"weekly": [
-#		"rustic_translator.tasks.weekly"
-#	],
-#	"monthly": [
-#		"rustic_translator.tasks.monthly"
-#	],
-# }
+scheduler_events = {
+	"daily": [
+		"rustic_translator.tasks.cleanup_backups"
+	],
+}
 
 # Testing
 # -------
@@ -185,7 +173,12 @@ page_js = {"translation-editor": "public/js/translation_editor.js"}
 
 # After Migrate
 # --------------------------------
-after_migrate = ["rustic_translator.setup_translations.after_migrate_sync_translations"]
+after_migrate = [
+    "rustic_translator.translation_sync.ensure_translation_index",
+    "rustic_translator.setup_translations.after_migrate_sync_translations",
+    "rustic_translator.source_index.after_migrate",
+    "rustic_translator.backup_store.after_migrate"
+]
 
 # Translation
 # --------------------------------
@@ -9,6 +9,10 @@ from frappe.model.document import Document
 class TranslationBackup(Document):
     def on_trash(self):
         """Delete the physical backup file when the record is deleted"""
+        # Stored states are shared between backups, the backup store collects them
+        if self.content_hash:
+            return
+
         if self.file_path and os.path.exists(self.file_path):
             try:
                 os.remove(self.file_path)
@@ -8,17 +8,43 @@ frappe.pages['translation-editor'].on_page_load = function(wrapper) {
     new TranslationEditor(wrapper, page);
 };
 
+// Longest a queued save may take before the editor stops waiting for it: the
+// job's own timeout (LOCK_TIMEOUT + 1800 s in save_pipeline) plus a margin
+const SAVE_TIMEOUT = 41 * 60 * 1000;
+
+// Same folding as rustic_translator.search_index.fold on the server
+function foldSearchText(text) {
+    return (text || '')
+        .normalize('NFKD')
+        .replace(/[\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]/g, '')
+        .replace(/\u0671/g, '\u0627')
+        .replace(/\u0649/g, '\u064a')
+        .toLowerCase();
+}
+
 class TranslationEditor {
     constructor(wrapper, page) {
         this.wrapper = wrapper;
         this.page = page;
-        this.translations = [];
+        this.rowsByIndex = new Map();   // position in the filtered list -> row
+        this.rowsById = new Map();      // row id -> row
+        this.renderedRows = new Map();  // position -> row element in the grid
+        this.loadedBlocks = new Set();
+        this.queryId = 0;
         this.originalTranslations = {};
-        this.currentPage = 1;
-        this.pageSize = 100;
+        this.modifiedRows = {};
+        this.modifiedCount = 0;
+        this.emptyDelta = 0;            // change in empty rows made by unsaved edits
+        this.totalCount = 0;
+        this.filteredCount = 0;
+        this.emptyCount = 0;
+        this.blockSize = 200;
+        this.rowHeight = 76;
+        this.overscan = 10;
         this.filterMode = 'all';
         this.searchQuery = '';
         this.sessionName = null;
+        this.fileVersion = null;
 
         this.setup();
     }
@@ -27,6 +53,23 @@ class TranslationEditor {
         this.setupPageActions();
         this.renderControls();
         this.loadApps();
+        this.listenForUpdates();
+    }
+
+    listenForUpdates() {
+        // Another user saved the file we have open
+        frappe.realtime.on('rustic_translator_translations_updated', (data) => {
+            const appName = $(this.wrapper).find('#te-app-select').val();
+            const langCode = $(this.wrapper).find('#te-lang-select').val();
+
+            if (data.user === frappe.session.user || data.language_code !== langCode) return;
+            if (data.app_name && data.app_name !== appName) return;
+
+            frappe.show_alert({
+                message: __('Translations were updated by {0}. Reload to see the changes.', [data.user]),
+                indicator: 'orange'
+            });
+        });
     }
 
     setupPageActions() {
@@ -71,7 +114,6 @@ class TranslationEditor {
                 </div>
                 <div class="te-stats text-muted mb-2" id="te-stats"></div>
                 <div class="te-grid-container" id="te-grid-container"></div>
-                <div class="te-pagination mt-3" id="te-pagination"></div>
             </div>
         `);
 
@@ -91,15 +133,25 @@ class TranslationEditor {
 
         $wrapper.find('#te-filter-select').on('change', (e) => {
             this.filterMode = e.target.value;
-            this.currentPage = 1;
-            this.renderGrid();
+            this.refreshRows();
         });
 
         $wrapper.find('#te-search').on('input', frappe.utils.debounce((e) => {
             this.searchQuery = e.target.value;
-            this.currentPage = 1;
-            this.renderGrid();
+            this.refreshRows();
         }, 300));
+
+        // Rows come and go while scrolling, so their handlers live on the container
+        $wrapper.find('#te-grid-container')
+            .on('input', '.te-input', (e) => this.onTranslationInput(e.target))
+            .on('click', '.te-edit-btn', (e) => {
+                const trans = this.rowsById.get(parseInt($(e.currentTarget).data('id')));
+                if (trans) this.showEditSourceDialog(trans);
+            })
+            .on('click', '.te-delete-btn', (e) => {
+                const trans = this.rowsById.get(parseInt($(e.currentTarget).data('id')));
+                if (trans) this.confirmDeleteTranslation(trans);
+            });
     }
 
     async loadApps() {
@@ -128,7 +180,7 @@ class TranslationEditor {
         $langSelect.html(`<option value="">${__('Select Language')}</option>`);
         $langSelect.prop('disabled', true);
 
-        this.translations = [];
+        this.resetState();
         this.renderGrid();
 
         if (!appName) return;
@@ -156,7 +208,7 @@ class TranslationEditor {
 
     async onLanguageChange(langCode) {
         if (!langCode) {
-            this.translations = [];
+            this.resetState();
             this.renderGrid();
             return;
         }
@@ -164,7 +216,33 @@ class TranslationEditor {
         await this.loadTranslations();
     }
 
-    async loadTranslations() {
+    resetState() {
+        this.queryId++;
+        this.rowsByIndex = new Map();
+        this.rowsById = new Map();
+        this.loadedBlocks = new Set();
+        this.originalTranslations = {};
+        this.clearModified();
+        this.totalCount = 0;
+        this.filteredCount = 0;
+        this.emptyCount = 0;
+        this.fileVersion = null;
+    }
+
+    clearModified() {
+        this.modifiedRows = {};
+        this.modifiedCount = 0;
+        this.emptyDelta = 0;
+    }
+
+    getVersionFor(appName) {
+        // Writes to the open file carry the version it was loaded at, so the
+        // server can refuse them when someone else changed the file meanwhile
+        const currentApp = $(this.wrapper).find('#te-app-select').val();
+        return appName === currentApp ? this.fileVersion : null;
+    }
+
+    async loadTranslations(keepSession = false) {
         const appName = $(this.wrapper).find('#te-app-select').val();
         const langCode = $(this.wrapper).find('#te-lang-select').val();
 
@@ -173,31 +251,13 @@ class TranslationEditor {
         frappe.show_progress(__('Loading'), 0, 100, __('Loading translations...'));
 
         try {
-            const response = await frappe.call({
-                method: 'rustic_translator.api.translation.load_translations',
-                args: {
-                    app_name: appName,
-                    language_code: langCode
-                }
-            });
-
-            const data = response.message;
-            console.log('Load response - file_path:', data.file_path);
-            console.log('Load response - file_mtime:', data.file_mtime);
-            console.log('Load response - loaded_at:', data.loaded_at);
-            console.log('Load response - total_count:', data.total_count);
-            console.log('Load response - first 3:', data.debug_first_3);
+            this.resetState();
+            await this.refreshRows();
 
-            this.translations = data.translations || [];
-
-            this.originalTranslations = {};
-            this.translations.forEach(t => {
-                this.originalTranslations[t.id] = t.translated_text || '';
-            });
-
-            this.currentPage = 1;
-            await this.createSession();
-            this.renderGrid();
+            // Single-row edits stay in the current session, so they share its backup
+            if (!keepSession || !this.sessionName) {
+                await this.createSession();
+            }
 
             frappe.hide_progress();
         } catch (error) {
@@ -210,6 +270,109 @@ class TranslationEditor {
         }
     }
 
+    async refreshRows(keepScroll = false) {
+        // Drops the rows loaded for the previous filter and loads the first block again
+        const viewport = this.wrapper.querySelector('#te-vgrid');
+        const scrollTop = keepScroll && viewport ? viewport.scrollTop : 0;
+
+        this.queryId++;
+        this.rowsByIndex = new Map();
+        this.loadedBlocks = new Set();
+
+        // Modified rows only live in the browser, so that filter is built locally
+        if (this.filterMode === 'modified') {
+            const modified = this.getFilteredModified();
+            modified.forEach((t, index) => this.rowsByIndex.set(index, t));
+            this.filteredCount = modified.length;
+        } else {
+            await this.loadBlock(Math.floor(scrollTop / this.rowHeight / this.blockSize));
+        }
+
+        this.renderGrid(scrollTop);
+    }
+
+    async loadBlock(block) {
+        const appName = $(this.wrapper).find('#te-app-select').val();
+        const langCode = $(this.wrapper).find('#te-lang-select').val();
+
+        if (!appName || !langCode || this.loadedBlocks.has(block)) return;
+
+        this.loadedBlocks.add(block);
+        const queryId = this.queryId;
+
+        let data;
+        try {
+            data = await this.fetchTranslations({
+                app_name: appName,
+                language_code: langCode,
+                start: block * this.blockSize,
+                page_length: this.blockSize,
+                search_text: this.searchQuery,
+                empty_only: this.filterMode === 'empty' ? 1 : 0
+            });
+        } catch (error) {
+            this.loadedBlocks.delete(block);
+            throw error;
+        }
+
+        // Another filter or search replaced this one while the block was loading
+        if (queryId !== this.queryId) return;
+
+        // Keep unsaved edits when a row comes back in another filter; a save
+        // also changes the duplicates of an edited row, so others are taken as loaded
+        (data.translations || []).forEach((t, index) => {
+            if (!(t.id in this.modifiedRows)) {
+                this.originalTranslations[t.id] = t.translated_text || '';
+            }
+            const row = this.modifiedRows[t.id] || t;
+            this.rowsByIndex.set(data.start + index, row);
+            this.rowsById.set(row.id, row);
+        });
+
+        // Unsaved edits stay based on the version they were made against
+        if (!this.fileVersion || this.getModifiedCount() === 0) {
+            this.fileVersion = data.version;
+        }
+
+        this.totalCount = data.total_count;
+        this.filteredCount = data.filtered_count;
+        this.emptyCount = data.empty_count;
+        this.scheduleRender();
+    }
+
+    async fetchTranslations(args) {
+        // A GET, so the browser revalidates its copy with If-None-Match and a
+        // block of an unchanged file costs a 304 instead of its rows
+        const params = new URLSearchParams({ ...args, columnar: 1 });
+        const response = await fetch(
+            `/api/method/rustic_translator.api.translation.load_translations?${params}`,
+            { headers: { 'Accept': 'application/json' } }
+        );
+        const body = await response.json().catch(() => ({}));
+
+        if (!response.ok) {
+            let message = __('Failed to load translations');
+            try {
+                message = JSON.parse(JSON.parse(body._server_messages)[0]).message;
+            } catch (e) {
+                // Keep the generic message
+            }
+            frappe.msgprint({ title: __('Error'), indicator: 'red', message: message });
+            throw new Error(message);
+        }
+
+        // Rows come as one list per field
+        const data = body.message;
+        const columns = data.columns;
+        data.translations = columns.id.map((id, i) => ({
+            id: id,
+            source_text: columns.source_text[i],
+            translated_text: columns.translated_text[i],
+            context: columns.context[i]
+        }));
+        return data;
+    }
+
     async createSession() {
         const appName = $(this.wrapper).find('#te-app-select').val();
         const langCode = $(this.wrapper).find('#te-lang-select').val();
@@ -228,25 +391,23 @@ class TranslationEditor {
         }
     }
 
-    getFilteredTranslations() {
-        let result = this.translations;
+    getFilteredModified() {
+        let result = Object.values(this.modifiedRows);
 
-        if (this.searchQuery) {
-            const query = this.searchQuery.toLowerCase();
+        const query = foldSearchText(this.searchQuery.trim());
+        if (query) {
             result = result.filter(t =>
-                t.source_text.toLowerCase().includes(query) ||
-                (t.translated_text || '').toLowerCase().includes(query) ||
-                (t.context || '').toLowerCase().includes(query)
+                foldSearchText(t.source_text).includes(query) ||
+                foldSearchText(t.translated_text).includes(query) ||
+                foldSearchText(t.context).includes(query)
             );
         }
 
-        if (this.filterMode === 'empty') {
-            result = result.filter(t => !t.translated_text || t.translated_text.trim() === '');
-        } else if (this.filterMode === 'modified') {
-            result = result.filter(t => this.isModified(t));
-        }
+        return result.sort((a, b) => a.id - b.id);
+    }
 
-        return result;
+    isEmpty(text) {
+        return !text || text.trim() === '';
     }
 
     isModified(trans) {
@@ -256,176 +417,173 @@ class TranslationEditor {
     }
 
     getModifiedCount() {
-        return this.translations.filter(t => this.isModified(t)).length;
+        return this.modifiedCount;
     }
 
     getEmptyCount() {
-        return this.translations.filter(t => !t.translated_text || t.translated_text.trim() === '').length;
+        // The server counts the file as saved; adjust for unsaved edits
+        return this.emptyCount + this.emptyDelta;
     }
 
-    renderGrid() {
-        const filtered = this.getFilteredTranslations();
-        const totalPages = Math.ceil(filtered.length / this.pageSize);
-        const start = (this.currentPage - 1) * this.pageSize;
-        const end = start + this.pageSize;
-        const pageData = filtered.slice(start, end);
+    renderGrid(scrollTop = 0) {
+        const $container = $(this.wrapper).find('#te-grid-container');
+        this.renderedRows = new Map();
+        this.updateStats();
 
-        const modifiedCount = this.getModifiedCount();
-        const emptyCount = this.getEmptyCount();
+        if (this.filteredCount === 0) {
+            $container.html(`
+                <div class="text-center text-muted p-5">
+                    <i class="fa fa-language fa-3x mb-3"></i>
+                    <p>${this.totalCount === 0 ? __('Select an app and language to load translations') : __('No translations match your filter')}</p>
+                </div>
+            `);
+            return;
+        }
 
-        $(this.wrapper).find('#te-stats').html(`
-            ${__('Showing')} ${pageData.length} ${__('of')} ${filtered.length} ${__('translations')}
-            (${this.translations.length} ${__('total')})
-            ${modifiedCount > 0 ? `<span class="text-warning"> | ${modifiedCount} ${__('modified')}</span>` : ''}
-            ${emptyCount > 0 ? `<span class="text-danger"> | ${emptyCount} ${__('empty')}</span>` : ''}
+        $container.html(`
+            <div class="te-vgrid-header">
+                <div class="te-col-index">#</div>
+                <div>${__('Source Text')}</div>
+                <div>${__('Translation')}</div>
+                <div>${__('Context')}</div>
+                <div class="text-center">${__('Actions')}</div>
+            </div>
+            <div class="te-vgrid" id="te-vgrid">
+                <div class="te-vgrid-spacer"></div>
+            </div>
         `);
 
-        let html = `
-            <table class="table table-bordered">
-                <thead>
-                    <tr>
-                        <th style="width: 40px">#</th>
-                        <th style="width: 35%">${__('Source Text')}</th>
-                        <th style="width: 35%">${__('Translation')}</th>
-                        <th style="width: 10%">${__('Context')}</th>
-                        <th style="width: 80px">${__('Actions')}</th>
-                    </tr>
-                </thead>
-                <tbody>
-        `;
+        const viewport = $container.find('#te-vgrid')[0];
+        viewport.addEventListener('scroll', () => this.scheduleRender(), { passive: true });
+        viewport.scrollTop = scrollTop;
 
-        pageData.forEach((trans, index) => {
-            const rowNum = start + index + 1;
-            const isModified = this.isModified(trans);
-            const isEmpty = !trans.translated_text || trans.translated_text.trim() === '';
-            const rowClass = isModified ? 'te-row-modified' : (isEmpty ? 'te-row-empty' : '');
-
-            html += `
-                <tr class="${rowClass}" data-id="${trans.id}">
-                    <td class="text-center">${rowNum}</td>
-                    <td>
-                        <div style="max-height: 80px; overflow-y: auto; word-break: break-word;">
-                            ${frappe.utils.escape_html(trans.source_text)}
-                        </div>
-                    </td>
-                    <td>
-                        <textarea class="form-control te-input" data-id="${trans.id}" rows="2"
-                            style="width: 100%;">${frappe.utils.escape_html(trans.translated_text || '')}</textarea>
-                    </td>
-                    <td class="text-muted" style="font-size: 12px;">
-                        ${frappe.utils.escape_html(trans.context || '-')}
-                    </td>
-                    <td class="text-center">
-                        <button class="btn btn-xs btn-default te-edit-btn" data-id="${trans.id}" title="${__('Edit Source')}">
-                            <i class="fa fa-pencil"></i>
-                        </button>
-                        <button class="btn btn-xs btn-danger te-delete-btn" data-id="${trans.id}" title="${__('Delete')}">
-                            <i class="fa fa-trash"></i>
-                        </button>
-                    </td>
-                </tr>
-            `;
+        this.renderVisibleRows();
+    }
+
+    scheduleRender() {
+        if (this.renderPending) return;
+        this.renderPending = true;
+
+        requestAnimationFrame(() => {
+            this.renderPending = false;
+            this.renderVisibleRows();
         });
+    }
 
-        html += '</tbody></table>';
+    renderVisibleRows() {
+        const viewport = this.wrapper.querySelector('#te-vgrid');
+        if (!viewport) return;
 
-        if (pageData.length === 0) {
-            html = `
-                <div class="text-center text-muted p-5">
-                    <i class="fa fa-language fa-3x mb-3"></i>
-                    <p>${this.translations.length === 0 ? __('Select an app and language to load translations') : __('No translations match your filter')}</p>
+        const spacer = viewport.firstElementChild;
+        spacer.style.height = `${this.filteredCount * this.rowHeight}px`;
+
+        const first = Math.max(0, Math.floor(viewport.scrollTop / this.rowHeight) - this.overscan);
+        const last = Math.min(
+            this.filteredCount - 1,
+            Math.ceil((viewport.scrollTop + viewport.clientHeight) / this.rowHeight) + this.overscan
+        );
+
+        // Rows still in view are kept as they are, so an input being typed in survives scrolling
+        this.renderedRows.forEach((element, index) => {
+            if (index < first || index > last) {
+                element.remove();
+                this.renderedRows.delete(index);
+            }
+        });
+
+        const missingBlocks = new Set();
+
+        for (let index = first; index <= last; index++) {
+            const trans = this.rowsByIndex.get(index);
+            const rendered = this.renderedRows.get(index);
+
+            if (!trans) missingBlocks.add(Math.floor(index / this.blockSize));
+            if (rendered && (rendered.dataset.loaded === '1' || !trans)) continue;
+            if (rendered) rendered.remove();
+
+            const element = this.createRow(index, trans);
+            spacer.appendChild(element);
+            this.renderedRows.set(index, element);
+        }
+
+        missingBlocks.forEach(block => this.loadBlock(block));
+    }
+
+    createRow(index, trans) {
+        const template = document.createElement('template');
+        const style = `top: ${index * this.rowHeight}px; height: ${this.rowHeight}px;`;
+
+        if (!trans) {
+            template.innerHTML = `
+                <div class="te-vrow text-muted" data-loaded="0" style="${style}">
+                    <div class="te-col-index">${index + 1}</div>
+                    <div>${__('Loading...')}</div>
                 </div>
             `;
+            return template.content.firstElementChild;
         }
 
-        $(this.wrapper).find('#te-grid-container').html(html);
+        const isModified = this.isModified(trans);
+        const isEmpty = this.isEmpty(trans.translated_text);
+        const rowClass = isModified ? 'te-row-modified' : (isEmpty ? 'te-row-empty' : '');
 
-        $(this.wrapper).find('.te-input').on('input', (e) => {
-            const id = parseInt($(e.target).data('id'));
-            const trans = this.translations.find(t => t.id === id);
-            if (trans) {
-                trans.translated_text = e.target.value;
-                const $row = $(e.target).closest('tr');
-                const isModified = this.isModified(trans);
-                const isEmpty = !trans.translated_text || trans.translated_text.trim() === '';
+        template.innerHTML = `
+            <div class="te-vrow ${rowClass}" data-loaded="1" data-id="${trans.id}" style="${style}">
+                <div class="te-col-index">${index + 1}</div>
+                <div class="te-source-text">${frappe.utils.escape_html(trans.source_text)}</div>
+                <div>
+                    <textarea class="form-control te-input" data-id="${trans.id}" rows="2">${frappe.utils.escape_html(trans.translated_text || '')}</textarea>
+                </div>
+                <div class="te-context">${frappe.utils.escape_html(trans.context || '-')}</div>
+                <div class="text-center">
+                    <button class="btn btn-xs btn-default te-edit-btn" data-id="${trans.id}" title="${__('Edit Source')}">
+                        <i class="fa fa-pencil"></i>
+                    </button>
+                    <button class="btn btn-xs btn-danger te-delete-btn" data-id="${trans.id}" title="${__('Delete')}">
+                        <i class="fa fa-trash"></i>
+                    </button>
+                </div>
+            </div>
+        `;
+        return template.content.firstElementChild;
+    }
 
-                $row.removeClass('te-row-modified te-row-empty');
-                if (isModified) $row.addClass('te-row-modified');
-                else if (isEmpty) $row.addClass('te-row-empty');
+    onTranslationInput(input) {
+        const trans = this.rowsById.get(parseInt(input.dataset.id));
+        if (!trans) return;
 
-                this.updateStats();
-            }
-        });
+        const wasModified = trans.id in this.modifiedRows;
+        const wasEmpty = this.isEmpty(trans.translated_text);
 
-        // Edit source text button
-        $(this.wrapper).find('.te-edit-btn').on('click', (e) => {
-            const id = parseInt($(e.currentTarget).data('id'));
-            const trans = this.translations.find(t => t.id === id);
-            if (trans) {
-                this.showEditSourceDialog(trans);
-            }
-        });
+        trans.translated_text = input.value;
+        const isModified = this.isModified(trans);
 
-        // Delete button
-        $(this.wrapper).find('.te-delete-btn').on('click', (e) => {
-            const id = parseInt($(e.currentTarget).data('id'));
-            const trans = this.translations.find(t => t.id === id);
-            if (trans) {
-                this.confirmDeleteTranslation(trans);
-            }
-        });
+        if (isModified) this.modifiedRows[trans.id] = trans;
+        else delete this.modifiedRows[trans.id];
+
+        // Counters follow the edit instead of rescanning the modified rows
+        this.modifiedCount += isModified - wasModified;
+        this.emptyDelta += this.isEmpty(trans.translated_text) - wasEmpty;
+
+        const $row = $(input).closest('.te-vrow');
+        $row.removeClass('te-row-modified te-row-empty');
+        if (isModified) $row.addClass('te-row-modified');
+        else if (this.isEmpty(trans.translated_text)) $row.addClass('te-row-empty');
 
-        this.renderPagination(totalPages);
+        this.updateStats();
     }
 
     updateStats() {
-        const filtered = this.getFilteredTranslations();
         const modifiedCount = this.getModifiedCount();
         const emptyCount = this.getEmptyCount();
 
         $(this.wrapper).find('#te-stats').html(`
-            ${__('Showing')} ${Math.min(this.pageSize, filtered.length)} ${__('of')} ${filtered.length} ${__('translations')}
-            (${this.translations.length} ${__('total')})
+            ${__('Showing')} ${this.filteredCount} ${__('of')} ${this.totalCount} ${__('translations')}
             ${modifiedCount > 0 ? `<span class="text-warning"> | ${modifiedCount} ${__('modified')}</span>` : ''}
             ${emptyCount > 0 ? `<span class="text-danger"> | ${emptyCount} ${__('empty')}</span>` : ''}
         `);
     }
 
-    renderPagination(totalPages) {
-        if (totalPages <= 1) {
-            $(this.wrapper).find('#te-pagination').html('');
-            return;
-        }
-
-        let html = `
-            <div class="d-flex justify-content-center align-items-center">
-                <button class="btn btn-default btn-sm mr-2" id="te-prev" ${this.currentPage === 1 ? 'disabled' : ''}>
-                    <i class="fa fa-chevron-left"></i> ${__('Previous')}
-                </button>
-                <span class="mx-3">${__('Page')} ${this.currentPage} ${__('of')} ${totalPages}</span>
-                <button class="btn btn-default btn-sm ml-2" id="te-next" ${this.currentPage === totalPages ? 'disabled' : ''}>
-                    ${__('Next')} <i class="fa fa-chevron-right"></i>
-                </button>
-            </div>
-        `;
-
-        $(this.wrapper).find('#te-pagination').html(html);
-
-        $(this.wrapper).find('#te-prev').on('click', () => {
-            if (this.currentPage > 1) {
-                this.currentPage--;
-                this.renderGrid();
-            }
-        });
-
-        $(this.wrapper).find('#te-next').on('click', () => {
-            if (this.currentPage < totalPages) {
-                this.currentPage++;
-                this.renderGrid();
-            }
-        });
-    }
-
     async saveTranslations() {
         const modifiedCount = this.getModifiedCount();
 
@@ -440,45 +598,43 @@ class TranslationEditor {
         frappe.show_progress(__('Saving'), 0, 100, __('Saving translations...'));
 
         try {
-            const modifiedTranslations = this.translations.filter(t => this.isModified(t));
-
-            for (const trans of modifiedTranslations) {
-                await frappe.call({
-                    method: 'rustic_translator.api.translation.log_translation_change',
-                    args: {
-                        session_name: this.sessionName,
-                        app_name: appName,
-                        source_text: trans.source_text,
-                        old_translation: this.originalTranslations[trans.id] || '',
-                        new_translation: trans.translated_text || '',
-                        context: trans.context
-                    }
-                });
-            }
-
-            // Debug: log first 3 translations being saved
-            console.log('Saving translations. First 3:', this.translations.slice(0, 3));
-            console.log('Modified translations:', modifiedTranslations.map(t => ({
-                id: t.id,
-                source: t.source_text.substring(0, 30),
-                translated: t.translated_text
-            })));
+            const modifiedTranslations = Object.values(this.modifiedRows);
 
+            // The save job logs the changes of the session itself
             const response = await frappe.call({
-                method: 'rustic_translator.api.translation.save_translations',
+                method: 'rustic_translator.api.translation.save_translation_changes',
                 args: {
                     app_name: appName,
                     language_code: langCode,
-                    translations: JSON.stringify(this.translations),
-                    session_name: this.sessionName
-                },
-                timeout: 300 // 5 minutes timeout for large files
+                    changes: JSON.stringify(modifiedTranslations.map(t => ({
+                        id: t.id,
+                        source_text: t.source_text,
+                        translated_text: t.translated_text || '',
+                        context: t.context || ''
+                    }))),
+                    session_name: this.sessionName,
+                    version: this.fileVersion
+                }
             });
 
-            if (response.message && response.message.success) {
-                this.translations.forEach(t => {
+            if (!response.message || !response.message.job_id) {
+                frappe.hide_progress();
+                frappe.msgprint({
+                    title: __('Save Failed'),
+                    indicator: 'red',
+                    message: JSON.stringify(response.message || response)
+                });
+                return;
+            }
+
+            const msg = await this.waitForSaveJob(response.message.job_id);
+
+            if (msg.status === 'done') {
+                this.fileVersion = msg.version;
+                modifiedTranslations.forEach(t => {
                     this.originalTranslations[t.id] = t.translated_text || '';
                 });
+                this.clearModified();
 
                 await frappe.call({
                     method: 'rustic_translator.api.translation.complete_edit_session',
@@ -489,23 +645,27 @@ class TranslationEditor {
                 });
 
                 frappe.hide_progress();
-                console.log('Full response:', response);
-                console.log('response.message:', response.message);
 
-                const msg = response.message || {};
                 frappe.show_alert({
-                    message: `Saved ${msg.rows_written || '?'} rows (verified: ${msg.verification_count || '?'}) to ${msg.file_path || 'unknown'}`,
+                    message: __('Saved {0} changed rows to {1}', [msg.rows_written || 0, msg.file_path || 'unknown']),
                     indicator: 'green'
                 });
 
                 await this.createSession();
-                this.renderGrid();
+                await this.refreshRows(true);
+            } else if (msg.conflict) {
+                frappe.hide_progress();
+                frappe.msgprint({
+                    title: __('File Changed'),
+                    indicator: 'orange',
+                    message: msg.error
+                });
             } else {
                 frappe.hide_progress();
                 frappe.msgprint({
                     title: __('Save Failed'),
                     indicator: 'red',
-                    message: JSON.stringify(response.message || response)
+                    message: __('Failed to save translations: {0}', [msg.error || msg.stage])
                 });
             }
         } catch (error) {
@@ -518,6 +678,65 @@ class TranslationEditor {
         }
     }
 
+    waitForSaveJob(jobId) {
+        // Resolves with the final state of a queued save, showing each stage as it runs.
+        // Realtime delivers the stages; polling covers messages missed while reconnecting.
+        // A job that never reports back (killed worker) fails after SAVE_TIMEOUT.
+        const stageLabels = {
+            backup: __('Creating backup...'),
+            write: __('Writing file...'),
+            verify: __('Verifying file...'),
+            db_sync: __('Updating database...'),
+            cache: __('Clearing cache...')
+        };
+
+        return new Promise((resolve) => {
+            let finished = false;
+            let poller = null;
+            let deadline = null;
+
+            const finish = (data) => {
+                finished = true;
+                frappe.realtime.off('rustic_translator_save_progress', onUpdate);
+                clearInterval(poller);
+                clearTimeout(deadline);
+                resolve(data);
+            };
+
+            const onUpdate = (data) => {
+                if (finished || !data || data.job_id !== jobId) return;
+
+                if (data.status === 'done' || data.status === 'failed') {
+                    finish(data);
+                    return;
+                }
+
+                frappe.show_progress(__('Saving'), data.step, data.steps,
+                    stageLabels[data.stage] || __('Waiting for other saves of this file...'));
+            };
+
+            frappe.realtime.on('rustic_translator_save_progress', onUpdate);
+
+            poller = setInterval(() => {
+                frappe.call({
+                    method: 'rustic_translator.api.translation.get_save_status',
+                    args: { job_id: jobId }
+                }).then((r) => onUpdate(r.message)).catch(() => {
+                    // A failed poll is retried on the next tick, the deadline ends the wait
+                });
+            }, 5000);
+
+            deadline = setTimeout(() => {
+                if (finished) return;
+                finish({
+                    job_id: jobId,
+                    status: 'failed',
+                    error: __('The save did not finish in time. Reload the file to see whether it was written.')
+                });
+            }, SAVE_TIMEOUT);
+        });
+    }
+
     discardChanges() {
         const modifiedCount = this.getModifiedCount();
 
@@ -529,16 +748,17 @@ class TranslationEditor {
         frappe.confirm(
             __('Are you sure you want to discard {0} changes?', [modifiedCount]),
             () => {
-                this.translations.forEach(t => {
+                Object.values(this.modifiedRows).forEach(t => {
                     t.translated_text = this.originalTranslations[t.id] || '';
                 });
+                this.clearModified();
 
                 frappe.show_alert({
                     message: __('Changes discarded'),
                     indicator: 'blue'
                 });
 
-                this.renderGrid();
+                this.refreshRows(true);
             }
         );
     }
@@ -675,7 +895,9 @@ class TranslationEditor {
                             language_code: langCode,
                             source_text: values.source_text,
                             translated_text: values.translated_text,
-                            context: values.context || ''
+                            context: values.context || '',
+                            version: this.getVersionFor(values.app_name),
+                            session_name: this.sessionName
                         }
                     });
 
@@ -692,7 +914,7 @@ class TranslationEditor {
                         // Reload if we're on the same app
                         const currentApp = $(this.wrapper).find('#te-app-select').val();
                         if (currentApp === values.app_name) {
-                            await this.loadTranslations();
+                            await this.loadTranslations(true);
                         }
                     } else {
                         frappe.msgprint({
@@ -764,7 +986,9 @@ class TranslationEditor {
                     language_code: langCode,
                     source_text: sourceText,
                     translated_text: translatedText,
-                    context: context || ''
+                    context: context || '',
+                    version: this.getVersionFor(appName),
+                    session_name: this.sessionName
                 }
             });
 
@@ -781,7 +1005,7 @@ class TranslationEditor {
                 // Reload if we're on the same app
                 const currentApp = $(this.wrapper).find('#te-app-select').val();
                 if (currentApp === appName) {
-                    await this.loadTranslations();
+                    await this.loadTranslations(true);
                 }
             }
         } catch (error) {
@@ -813,6 +1037,10 @@ class TranslationEditor {
                     <strong>${__('Found in')}:</strong> ${result.found_in.join(', ')}<br>
                     <small class="text-muted">${__('Files')}: ${result.files.slice(0, 3).join(', ')}${result.files.length > 3 ? '...' : ''}</small>
                 </div>`;
+            } else if (result.indexing) {
+                html = `<div class="text-muted" style="margin: 10px 0;">
+                    ${__('The source code is still being indexed. Try again in a few minutes.')}
+                </div>`;
             } else {
                 html = `<div class="text-warning" style="margin: 10px 0;">
                     ${__('Text not found in source code. You can add it to either app.')}
@@ -867,7 +1095,9 @@ class TranslationEditor {
                             old_source_text: trans.source_text,
                             new_source_text: values.source_text,
                             translated_text: values.translated_text,
-                            context: values.context || ''
+                            context: values.context || '',
+                            version: this.getVersionFor(appName),
+                            session_name: this.sessionName
                         }
                     });
 
@@ -878,7 +1108,7 @@ class TranslationEditor {
                             indicator: 'green',
                             message: __('Translation updated successfully!')
                         });
-                        await this.loadTranslations();
+                        await this.loadTranslations(true);
                     }
                 } catch (error) {
                     frappe.msgprint({
@@ -908,7 +1138,9 @@ class TranslationEditor {
                         args: {
                             app_name: appName,
                             language_code: langCode,
-                            source_text: trans.source_text
+                            source_text: trans.source_text,
+                            version: this.getVersionFor(appName),
+                            session_name: this.sessionName
                         }
                     });
 
@@ -917,7 +1149,7 @@ class TranslationEditor {
                             message: __('Translation deleted successfully!'),
                             indicator: 'green'
                         });
-                        await this.loadTranslations();
+                        await this.loadTranslations(true);
                     }
                 } catch (error) {
                     frappe.msgprint({
@@ -0,0 +1,284 @@
+"""
+Background pipeline for saving a translation file.
+
+A save runs backup -> write -> verify -> DB sync -> cache invalidate. On
+large files that does not fit in a web request, so the
+whitelisted save methods only validate their input and queue a job here,
+which reports every stage to the editor over realtime.
+
+Jobs hold the write lock of their file for their whole run, so saves of the
+same file execute one after another even on different workers, and check
+the version the editor loaded under that lock.
+"""
+
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime
+
+from rustic_translator.csv_store import write_bytes, write_rows
+from rustic_translator.file_cache import (
+    encode_row,
+    get_file_version,
+    get_translation_file,
+    invalidate,
+    get_translation_keys,
+    iter_translation_rows,
+    translation_key,
+)
+from rustic_translator.translation_sync import sync_translation_rows, sync_translations
+
+STAGES = ("backup", "write", "verify", "db_sync", "cache")
+
+REALTIME_EVENT = "rustic_translator_save_progress"
+
+# Seconds a job waits for the save of the same file before it gives up
+LOCK_TIMEOUT = 600
+
+# Seconds the last reported state of a job stays readable
+JOB_STATUS_TTL = 24 * 60 * 60
+
+
+def get_job_status(job_id):
+    """Return the last reported state of a save job, or None"""
+    return frappe.cache().get_value(f"{REALTIME_EVENT}:{job_id}")
+
+
+def report(job_id, stage, status="running", **data):
+    """Store the state of a job and push it to the user who queued it"""
+    message = {
+        "job_id": job_id,
+        "stage": stage,
+        "status": status,
+        "step": STAGES.index(stage) + 1 if stage in STAGES else 0,
+        "steps": len(STAGES),
+        **data
+    }
+    frappe.cache().set_value(f"{REALTIME_EVENT}:{job_id}", message, expires_in_sec=JOB_STATUS_TTL)
+    frappe.publish_realtime(REALTIME_EVENT, message, user=frappe.session.user)
+
+
+def enqueue_save(app_name, language_code, mode, payload, site_name=None, session_name=None, version=None):
+    """
+    Queue a save and return its job id at once
+    - mode "rows" replaces the file with payload, a list of [source, translated(, context)]
+    - mode "changes" updates only the rows in payload, a list of change dicts
+    - version is the file version the payload was based on
+    """
+    job_id = frappe.generate_hash(length=12)
+    report(job_id, None, "queued")
+
+    frappe.enqueue(
+        "rustic_translator.save_pipeline.run_save",
+        queue="long",
+        timeout=LOCK_TIMEOUT + 1800,
+        job_id=f"rustic_translator::save::{job_id}",
+        enqueue_after_commit=True,
+        save_job_id=job_id,
+        app_name=app_name,
+        language_code=language_code,
+        mode=mode,
+        payload=payload,
+        site_name=site_name,
+        session_name=session_name,
+        version=version
+    )
+
+    return job_id
+
+
+def resolve_changes(store, changes):
+    """
+    Return ({position: new_row}, missing_source_texts) for a list of change dicts
+    - id is the position of the edited row in the version the editor loaded;
+      a change whose row does not hold its source text there is missing
+    - The translation is applied to every row with the same source text, so
+      duplicates stay equal; of two changes to the same rows the later wins
+    - An empty context keeps the context the row already has
+    """
+    updated_rows = {}
+    missing = []
+
+    for change in changes:
+        if not isinstance(change, dict) or not change.get("source_text"):
+            continue
+
+        positions = store.find_all(change["source_text"])
+        if not positions or (change.get("id") is not None and cint(change["id"]) not in positions):
+            missing.append(change["source_text"])
+            continue
+
+        for position in positions:
+            row = store.get_row(position)
+            new_row = [row[0], change.get("translated_text") or ""]
+            if change.get("context"):
+                new_row.append(change["context"])
+            elif len(row) > 2:
+                new_row.append(row[2])  # Keep existing context
+            updated_rows[position] = new_row
+
+    return updated_rows, missing
+
+
+def get_removed_keys(store, keys):
+    """Return the (source_text, context) pairs of keys that no row of the store has any more"""
+    removed = []
+    for key in keys:
+        rows = (store.get_row(position) for position in store.find_all(key[0]))
+        if all(translation_key(row) != key for row in rows):
+            removed.append(key)
+    return removed
+
+
+def verify_rows(file_path, rows):
+    """Read the file back and check it holds exactly the written rows"""
+    invalidate(file_path)
+    written = get_translation_file(file_path).rows
+
+    if len(written) != len(rows):
+        frappe.throw(_("File verification failed - wrote {0} rows, read back {1}").format(len(rows), len(written)))
+
+    return len(written)
+
+
+def verify_changes(file_path, updated_rows):
+    """Read back the byte range of every changed row and compare it to the row"""
+    translation_file = get_translation_file(file_path)
+
+    with open(file_path, "rb") as f:
+        for position, row in updated_rows.items():
+            start, end = translation_file.get_span(position)
+            f.seek(start)
+            if f.read(end - start) != encode_row(row):
+                frappe.throw(_("File verification failed for: {0}").format(row[0]))
+
+    return len(updated_rows)
+
+
+def run_save(save_job_id, app_name, language_code, mode, payload, site_name=None, session_name=None, version=None):
+    """Run the save pipeline of one file, one job per (app, language) at a time"""
+    from rustic_translator.api.translation import get_translation_file_path, lock_translation_file
+
+    file_path = get_translation_file_path(app_name, language_code)
+    stage = None
+
+    def enter(name):
+        nonlocal stage
+        stage = name
+        report(save_job_id, name)
+
+    try:
+        with lock_translation_file(file_path, version, timeout=LOCK_TIMEOUT):
+            result = _save(enter, app_name, language_code, file_path, mode, payload, site_name, session_name)
+            result["version"] = get_file_version(file_path)
+    except frappe.TimestampMismatchError as e:
+        report(save_job_id, stage, "failed", error=str(e), conflict=True)
+        return
+    except Exception as e:
+        frappe.log_error(frappe.get_traceback(), "Translation Save Error")
+        report(save_job_id, stage, "failed", error=str(e))
+        raise
+
+    report(save_job_id, "cache", "done", **result)
+    return result
+
+
+def _save(enter, app_name, language_code, file_path, mode, payload, site_name, session_name):
+    from rustic_translator.api.translation import (
+        execute_bench_commands,
+        get_session_backup,
+        get_translation_store,
+        insert_change_logs
+    )
+
+    settings = frappe.get_single("Translation Manager Settings")
+
+    if not site_name:
+        site_name = settings.default_site or frappe.local.site
+
+    enter("backup")
+    backup_hash = get_session_backup(app_name, language_code, file_path, session_name)
+
+    # The session backup may predate earlier saves, so a failed save is undone from memory
+    with open(file_path, "rb") as f:
+        original = f.read()
+
+    # Translations in the file before the save, to find rows that were dropped
+    previous_keys = get_translation_keys(file_path)
+
+    try:
+        enter("write")
+        if mode == "rows":
+            write_rows(file_path, payload)
+        else:
+            store = get_translation_store(file_path)
+            updated_rows, missing = resolve_changes(store, payload)
+            if missing:
+                frappe.throw(_("Translations not found in CSV: {0}").format(", ".join(missing[:10])))
+
+            # Old translations are taken from the file, before it is written
+            # Duplicates of a source text are logged once
+            change_logs = {}
+            old_keys = set()
+            for position, new_row in updated_rows.items():
+                old_row = store.get_row(position)
+                old_keys.add(translation_key(old_row))
+                if old_row[1] != new_row[1]:
+                    change_logs.setdefault(translation_key(new_row), (
+                        new_row[0], old_row[1], new_row[1], new_row[2] if len(new_row) > 2 else None
+                    ))
+
+            store.apply_changes(updated_rows)
+
+        enter("verify")
+        file_size = os.path.getsize(file_path)
+        if file_size == 0 and payload:
+            frappe.throw(_("File write failed - file is empty after write"))
+
+        if mode == "rows":
+            rows_written = verify_rows(file_path, payload)
+        else:
+            rows_written = verify_changes(file_path, updated_rows)
+
+        enter("db_sync")
+        if mode == "rows":
+            removed_keys = previous_keys.difference(get_translation_keys(file_path))
+            # Not import_translations_to_db: it commits on its own and swallows
+            # errors, this has to stay in the transaction rolled back below
+            db_sync = sync_translations(language_code, iter_translation_rows(file_path), removed_keys)
+        else:
+            # A changed context leaves the translation of the old one behind
+            db_sync = sync_translation_rows(language_code, [
+                (row[0], row[1], row[2] if len(row) > 2 else None) for row in updated_rows.values()
+            ], get_removed_keys(store, old_keys))
+
+            # Logged in the same transaction as the database sync
+            if session_name:
+                insert_change_logs(session_name, app_name, list(change_logs.values()))
+
+        settings.last_edited_by = frappe.session.user
+        settings.last_edited_on = now_datetime()
+        settings.save(ignore_permissions=True)
+
+        frappe.db.commit()
+
+    except Exception:
+        # Rollback: restore from backup
+        write_bytes(file_path, original)
+        invalidate(file_path)
+
+        frappe.db.rollback()
+        raise
+
+    # The file and the database agree from here on, cache clearing does not roll back
+    enter("cache")
+    execute_bench_commands(site_name, app_name, language_code)
+
+    return {
+        "backup_hash": backup_hash,
+        "file_path": file_path,
+        "rows_written": rows_written,
+        "file_size": file_size,
+        "db_sync": db_sync
+    }
@@ -0,0 +1,105 @@
+"""
+Search index over the rows of a translation file.
+
+The editor's search used to lowercase the source, translation and context of
+every row on each request. Each cached translation file now carries the
+folded text of its rows, built once when first searched: lowercased, with
+diacritics (Arabic harakat included) and tatweel removed and the alef and
+yeh variants unified, so "مُحَمَّد" is found by "محمد".
+
+The folded rows are joined into one string, so a substring query is a run
+of str.find over it, mapped back to rows by bisecting the row starts. Edits
+to the file update the folded text of the edited row only; the joined string
+is rebuilt lazily on the next search. The empty translations are tracked the
+same way, so their count needs no scan.
+"""
+
+import bisect
+import re
+import unicodedata
+
+# Rows and the fields of a row are joined with characters that cannot be typed,
+# so a match never spans two fields
+ROW_SEPARATOR = "\x00"
+FIELD_SEPARATOR = "\x01"
+
+# Letter variants searched as their base letter, and tatweel
+FOLDED_LETTERS = str.maketrans({"ٱ": "ا", "ى": "ي", "ـ": None})
+
+# Latin combining accents, Arabic harakat, superscript alef and Quranic marks
+COMBINING_MARKS = re.compile(r"[\u0300-\u036f\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+
+
+def fold(text):
+    """Return text lowercased, without diacritics and with letter variants unified"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text).translate(FOLDED_LETTERS)
+    text = COMBINING_MARKS.sub("", text)
+    return text.lower().replace(ROW_SEPARATOR, "").replace(FIELD_SEPARATOR, "")
+
+
+def fold_row(row):
+    return FIELD_SEPARATOR.join(fold(field) for field in row[:3])
+
+
+def is_translation_row(row):
+    return bool(row) and len(row) >= 2
+
+
+class SearchIndex:
+    """Folded text and empty flags of the rows of one translation file"""
+
+    def __init__(self, rows):
+        # Position -> folded text, for every row with a translation column
+        self._folded = {}
+        self.empty = set()
+        self.total = 0
+        for position, row in enumerate(rows):
+            self.update(position, row)
+
+    def update(self, position, row):
+        """Record the row now at position; None for a removed row"""
+        if position in self._folded:
+            del self._folded[position]
+            self.total -= 1
+        self.empty.discard(position)
+
+        if is_translation_row(row):
+            self._folded[position] = fold_row(row)
+            self.total += 1
+            if not row[1].strip():
+                self.empty.add(position)
+
+        self._text = None
+
+    def _build(self):
+        self.positions = sorted(self._folded)
+        self._starts = []
+        offset = 0
+        for position in self.positions:
+            self._starts.append(offset)
+            offset += len(self._folded[position]) + 1
+        self._text = ROW_SEPARATOR.join(self._folded[position] for position in self.positions)
+
+    def search(self, query=None):
+        """Return the positions of the rows whose fields contain query, in file order"""
+        if self._text is None:
+            self._build()
+
+        query = fold(query)
+        if not query:
+            return list(self.positions)
+
+        text = self._text
+        matches = []
+        at = text.find(query)
+        while at != -1:
+            row = bisect.bisect_right(self._starts, at) - 1
+            matches.append(self.positions[row])
+            # Continue after the matched row, a row is listed once
+            if row + 1 == len(self._starts):
+                break
+            at = text.find(query, self._starts[row + 1])
+
+        return matches
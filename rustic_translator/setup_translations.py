@@ -1,123 +1,320 @@
 """
-Centralized Arabic translation sync for all Rustic apps.
+Centralized translation sync for all Rustic apps.
 
-This is the SINGLE SOURCE OF TRUTH for custom Arabic translations.
-All translations live in translations/ar.csv (version-controlled).
-On every `bench migrate`, this script syncs them into the Translation DocType
-(highest priority in Frappe's translation system), ensuring they survive
-Frappe/ERPNext updates.
+This is the SINGLE SOURCE OF TRUTH for custom translations.
+Translations live in translations/<language>.csv (version-controlled) of every
+app the translation editor may edit. On every `bench migrate`, this script
+syncs them into the Translation DocType (highest priority in Frappe's
+translation system), ensuring they survive Frappe/ERPNext updates.
+
+CSV files of the same language are merged in app order, so a later app
+overrides an earlier one. Languages are independent of each other and are
+synced in parallel worker threads, each with its own database connection.
 
 Replaces the individual setup_translations hooks in erpnext_expenses and pos_next.
 """
 
-import csv
+import hashlib
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import frappe
+from frappe.utils import cint, update_progress_bar
 
+from rustic_translator.api.translation import ALLOWED_APPS
+from rustic_translator.cache_invalidation import invalidate_translation_cache
+from rustic_translator.file_cache import iter_translation_rows
+from rustic_translator.translation_sync import (
+    BATCH_SIZE,
+    delete_translations,
+    hash_text,
+    insert_translations,
+    update_translations,
+)
 
-def get_csv_path():
-    """Return the absolute path to translations/ar.csv."""
-    return os.path.join(
-        os.path.dirname(__file__), "translations", "ar.csv"
-    )
+SETTINGS_DOCTYPE = "Translation Manager Settings"
+
+# Upper bound on languages processed at the same time
+MAX_WORKERS = 4
+
+
+def get_translation_files():
+    """Return {language: [csv_path, ...]} for every translations/*.csv.
+
+    Only apps in ALLOWED_APPS that are installed on the site are considered,
+    and the paths of each language are listed in ALLOWED_APPS order.
+    """
+    installed_apps = frappe.get_installed_apps()
+    files = {}
+    for app_name in ALLOWED_APPS:
+        if app_name not in installed_apps:
+            continue
+
+        translations_path = frappe.get_app_path(app_name, "translations")
+        if not os.path.isdir(translations_path):
+            continue
+
+        for filename in sorted(os.listdir(translations_path)):
+            if filename.endswith(".csv") and not filename.startswith("."):
+                files.setdefault(filename[:-4], []).append(
+                    os.path.join(translations_path, filename)
+                )
+    return files
+
+
+def run_per_language(func, jobs):
+    """Run func(language, *args) for every {language: args} entry.
+
+    Languages run in parallel worker threads, each initialised on the current
+    site with its own database connection. Returns {language: result}.
+    """
+    if len(jobs) <= 1:
+        return {language: func(language, *args) for language, args in jobs.items()}
+
+    site = frappe.local.site
+    sites_path = frappe.local.sites_path
+
+    def worker(language, args):
+        frappe.init(site=site, sites_path=sites_path)
+        frappe.connect()
+        try:
+            return func(language, *args)
+        finally:
+            frappe.destroy()
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(jobs))) as executor:
+        futures = {
+            language: executor.submit(worker, language, args)
+            for language, args in jobs.items()
+        }
+        return {language: future.result() for language, future in futures.items()}
 
 
 def read_csv_translations(csv_path):
     """Read translations from the CSV file.
 
-    Returns a dict {source_text: translated_text}.
+    Returns a dict {(source_text, context): translated_text}.
     """
-    translations = {}
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if len(row) >= 2 and row[0].strip() and row[1].strip():
-                translations[row[0].strip()] = row[1].strip()
-    return translations
+    return {
+        (source_text, context): translated_text
+        for source_text, translated_text, context in iter_translation_rows(csv_path)
+    }
 
 
-def after_migrate_sync_translations():
-    """Sync translations/ar.csv into the Translation DocType.
+def get_csv_fingerprint(csv_paths):
+    """Return a SHA-256 over the names and contents of the CSV files."""
+    digest = hashlib.sha256()
+    for csv_path in csv_paths:
+        digest.update(csv_path.encode("utf-8"))
+        with open(csv_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_db_fingerprint(language):
+    """Return a cheap checksum of the Translation rows for a language.
+
+    Row count plus the latest modified timestamp changes whenever a row is
+    inserted, deleted or updated through the ORM or our own SQL.
+    """
+    row_count, last_modified = frappe.db.sql(
+        """
+        SELECT COUNT(*), MAX(modified)
+        FROM tabTranslation
+        WHERE language = %s
+        """,
+        (language,),
+    )[0]
+    return f"{row_count}:{last_modified}"
+
+
+def get_stored_fingerprints():
+    """Return the fingerprints saved by the last sync, keyed by language."""
+    value = frappe.db.get_single_value(SETTINGS_DOCTYPE, "sync_fingerprints")
+    if not value:
+        return {}
+    return value if isinstance(value, dict) else json.loads(value)
+
+
+def store_fingerprints(updates):
+    """Save {language: {csv, db}} fingerprints from the latest sync."""
+    fingerprints = get_stored_fingerprints()
+    fingerprints.update(updates)
+    frappe.db.set_single_value(
+        SETTINGS_DOCTYPE, "sync_fingerprints", json.dumps(fingerprints, sort_keys=True)
+    )
 
-    For each entry in the CSV:
+
+def get_batch_size():
+    """Return the configured rows per statement for the sync."""
+    return cint(frappe.db.get_single_value(SETTINGS_DOCTYPE, "sync_batch_size")) or BATCH_SIZE
+
+
+def run_in_batches(title, values, batch_size, write, show_progress=True):
+    """Call write(batch, batch_size) over values, printing a progress bar."""
+    for i in range(0, len(values), batch_size):
+        write(values[i:i + batch_size], batch_size)
+        if show_progress:
+            update_progress_bar(title, min(i + batch_size, len(values)) - 1, len(values))
+    if values and show_progress:
+        print()
+
+
+def sync_language(language, csv_paths, stored, batch_size, show_progress=True):
+    """Sync the merged CSV files of one language into the Translation DocType.
+
+    Skipped outright when neither the CSV files nor the Translation rows of
+    the language changed since the last sync. Otherwise, for each source text
+    and context:
     - If duplicates exist in DB, delete extras and keep one
-    - If the kept entry differs from CSV, update it
+    - If the kept entry's hash differs from CSV, update it
     - If no entry exists, insert a new one
 
-    Called via after_migrate hook in hooks.py.
+    Inserts, updates and deletes are written as multi-row statements of
+    batch_size rows, in one transaction.
+
+    Returns a summary dict including the fingerprint to store.
     """
-    csv_path = get_csv_path()
-    if not os.path.exists(csv_path):
-        print(f"rustic_translator: translations/ar.csv not found at {csv_path}")
-        return
+    summary = {"new": 0, "updated": 0, "deduped": 0, "total": 0, "skipped": False}
+
+    csv_fingerprint = get_csv_fingerprint(csv_paths)
+    if stored.get("csv") == csv_fingerprint and stored.get("db") == get_db_fingerprint(language):
+        summary["skipped"] = True
+        return summary
+
+    translations = {}
+    for csv_path in csv_paths:
+        translations.update(read_csv_translations(csv_path))
 
-    translations = read_csv_translations(csv_path)
+    summary["total"] = len(translations)
     if not translations:
-        print("rustic_translator: ar.csv is empty, skipping")
-        return
+        summary["skipped"] = True
+        return summary
 
-    # Fetch ALL existing Arabic translations from DB in one query
+    # Fetch ALL existing translations of the language from DB in one query,
+    # comparing by hash so the translated texts don't have to be transferred
     existing = frappe.db.sql(
         """
-        SELECT name, source_text, translated_text
+        SELECT name, source_text, context, MD5(translated_text) AS translated_hash
         FROM tabTranslation
-        WHERE language = 'ar'
+        WHERE language = %s
         ORDER BY modified DESC
         """,
+        (language,),
         as_dict=True,
     )
 
-    # Build a map: source_text -> list of {name, translated_text}
-    # Ordered by modified DESC (most recent first)
+    # Build a map: (source_text, context) -> list of {name, translated_hash}
+    # Ordered by modified DESC (most recent first); other contexts of a source
+    # text are translations of their own, not duplicates
     existing_map = {}
     for row in existing:
-        existing_map.setdefault(row.source_text, []).append(row)
+        existing_map.setdefault((row.source_text, row.context or None), []).append(row)
 
-    count_new = 0
-    count_updated = 0
-    count_deduped = 0
+    to_delete = []
+    to_update = []
+    to_insert = []
 
-    for source_text, translated_text in translations.items():
-        entries = existing_map.get(source_text, [])
+    for (source_text, context), translated_text in translations.items():
+        entries = existing_map.get((source_text, context), [])
 
-        if len(entries) > 1:
-            # Delete all duplicates, keep the first (most recently modified)
-            for entry in entries[1:]:
-                frappe.db.sql(
-                    "DELETE FROM tabTranslation WHERE name = %s", entry.name
-                )
-                count_deduped += 1
+        # Delete all duplicates, keep the first (most recently modified)
+        to_delete.extend(entry.name for entry in entries[1:])
 
         if entries:
             # Update the kept entry if translation differs
             keeper = entries[0]
-            if keeper.translated_text != translated_text:
-                frappe.db.sql(
-                    "UPDATE tabTranslation SET translated_text = %s, modified = NOW() WHERE name = %s",
-                    (translated_text, keeper.name),
-                )
-                count_updated += 1
+            if keeper.translated_hash != hash_text(translated_text):
+                to_update.append((keeper.name, translated_text, None))
         else:
             # Insert new translation
-            doc = frappe.get_doc(
-                {
-                    "doctype": "Translation",
-                    "language": "ar",
-                    "source_text": source_text,
-                    "translated_text": translated_text,
-                }
-            )
-            doc.insert(ignore_permissions=True)
-            count_new += 1
+            to_insert.append((
+                frappe.generate_hash(length=10),
+                language,
+                source_text,
+                translated_text,
+                context,
+                frappe.session.user,
+                frappe.session.user,
+            ))
 
-    if count_new or count_updated or count_deduped:
+    try:
+        run_in_batches(
+            f"Removing duplicate {language} translations",
+            to_delete,
+            batch_size,
+            delete_translations,
+            show_progress,
+        )
+        run_in_batches(
+            f"Updating {language} translations",
+            to_update,
+            batch_size,
+            lambda batch, size: update_translations(batch, size, update_context=False),
+            show_progress,
+        )
+        run_in_batches(
+            f"Inserting {language} translations",
+            to_insert,
+            batch_size,
+            insert_translations,
+            show_progress,
+        )
         frappe.db.commit()
-        frappe.cache.delete_key("translations")
-        frappe.cache.delete_key("lang_user_translations")
+    except Exception:
+        frappe.db.rollback()
+        raise
 
-    print(
-        f"rustic_translator: {count_new} new, {count_updated} updated, "
-        f"{count_deduped} duplicates removed "
-        f"(total {len(translations)} entries in ar.csv)"
+    summary.update(
+        new=len(to_insert),
+        updated=len(to_update),
+        deduped=len(to_delete),
+        fingerprint={"csv": csv_fingerprint, "db": get_db_fingerprint(language)},
     )
+    return summary
+
+
+def after_migrate_sync_translations():
+    """Sync every translations/<language>.csv into the Translation DocType.
+
+    Called via after_migrate hook in hooks.py.
+    """
+    files = get_translation_files()
+    if not files:
+        print("rustic_translator: no translation CSV files found")
+        return
+
+    stored = get_stored_fingerprints()
+    batch_size = get_batch_size()
+    show_progress = len(files) == 1
+
+    results = run_per_language(
+        sync_language,
+        {
+            language: (csv_paths, stored.get(language) or {}, batch_size, show_progress)
+            for language, csv_paths in files.items()
+        },
+    )
+
+    fingerprints = {
+        language: summary["fingerprint"]
+        for language, summary in results.items()
+        if summary.get("fingerprint")
+    }
+    if fingerprints:
+        store_fingerprints(fingerprints)
+        frappe.db.commit()
+        for language in fingerprints:
+            invalidate_translation_cache(None, language, notify=False)
+
+    for language, summary in sorted(results.items()):
+        if summary["skipped"]:
+            print(f"rustic_translator: {language} unchanged, skipping sync")
+        else:
+            print(
+                f"rustic_translator: {language}: {summary['new']} new, "
+                f"{summary['updated']} updated, {summary['deduped']} duplicates removed "
+                f"(total {summary['total']} entries in {len(files[language])} CSV files)"
+            )
@@ -0,0 +1,239 @@
+"""
+Index of the translatable strings in the source code of the allowed apps.
+
+Finding the app a string belongs to used to run grep over the whole frappe
+and erpnext trees on every lookup. The strings passed to _() and __() in
+.py, .js and .html files, and the labels, descriptions and titles in .json
+files, are now extracted once into an index that maps each string to the
+files and lines it appears on.
+
+The index is kept in the site's private files together with the mtime and
+content hash of every file it was built from. Refreshing it only looks at
+files whose mtime changed, re-extracts those whose content changed too, in a
+process pool when there are many, and runs as a background job after migrate and whenever a
+lookup finds the index older than REFRESH_INTERVAL. Lookups are dictionary
+hits on a copy held in memory, reloaded when a new index was stored.
+"""
+
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import frappe
+from frappe.utils import get_bench_path
+
+from rustic_translator.csv_store import write_bytes
+
+SOURCE_EXTENSIONS = (".py", ".js", ".html", ".json")
+
+# Directories that hold dependencies, build output or caches, not source
+SKIPPED_DIRECTORIES = {"node_modules", "__pycache__", "dist", "build", "locale", "translations"}
+
+# Seconds after which a lookup queues a refresh of the index
+REFRESH_INTERVAL = 60 * 60
+
+# Changed files below this count are extracted in the current process
+POOL_THRESHOLD = 200
+
+# A string literal passed as first argument to _() or __()
+CALL_PATTERN = re.compile(
+    r"""(?<![\w$])__?\(\s*(?P<quote>["'`])(?P<text>(?:\\.|(?!(?P=quote)).)*)(?P=quote)""",
+    re.DOTALL
+)
+
+# The translatable properties of doctype, report and workspace JSON
+JSON_PATTERN = re.compile(r'"(?:label|description|title)":\s*"(?P<text>(?:\\.|[^"\\])*)"')
+
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+
+_index = {"strings": None, "signature": None}
+_lock = threading.Lock()
+
+
+def get_index_path():
+    return frappe.get_site_path("private", "rustic_translator", "source_index.json.gz")
+
+
+def unescape(text):
+    return re.sub(r"\\(.)", lambda match: ESCAPES.get(match.group(1), match.group(1)), text, flags=re.DOTALL)
+
+
+def hash_file(file_path):
+    try:
+        with open(file_path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def extract_strings(file_path):
+    """Return [(text, line), ...] for the translatable strings of a source file"""
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            content = f.read()
+    except (OSError, UnicodeDecodeError):
+        return []
+
+    pattern = JSON_PATTERN if file_path.endswith(".json") else CALL_PATTERN
+    line_starts = [0] + [match.end() for match in re.finditer("\n", content)]
+
+    strings = []
+    for match in pattern.finditer(content):
+        text = unescape(match.group("text")).strip()
+        if text:
+            strings.append((text, bisect.bisect_right(line_starts, match.start("text"))))
+
+    return strings
+
+
+def iter_source_files(app_name):
+    """Yield (relative_path, absolute_path, mtime_ns) for the source files of an app"""
+    app_path = os.path.join(get_bench_path(), "apps", app_name)
+
+    for root, dirs, files in os.walk(app_path):
+        dirs[:] = [d for d in dirs if not d.startswith(".") and d not in SKIPPED_DIRECTORIES]
+
+        for filename in files:
+            if not filename.endswith(SOURCE_EXTENSIONS) or filename.endswith(".min.js"):
+                continue
+
+            path = os.path.join(root, filename)
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+            yield os.path.relpath(path, app_path), path, mtime
+
+
+def read_index():
+    """Return the stored index, {app: {relative_path: [mtime_ns, sha1, [[text, line], ...]]}}"""
+    try:
+        with gzip.open(get_index_path(), "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_index(index):
+    path = get_index_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_bytes(path, gzip.compress(json.dumps(index).encode("utf-8")))
+
+
+def extract_all(paths):
+    """Return the extracted strings of every path, in order, using all cores for long lists"""
+    if len(paths) < POOL_THRESHOLD:
+        return [extract_strings(path) for path in paths]
+
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(extract_strings, paths, chunksize=64))
+
+
+def refresh_index(apps=None):
+    """
+    Bring the stored index up to date with the source files of the apps
+    - Files whose mtime did not change keep their extracted strings
+    - Files with a new mtime but the same content hash keep them as well
+    - Returns the number of files whose strings were extracted
+    """
+    if apps is None:
+        from rustic_translator.api.translation import ALLOWED_APPS
+        apps = ALLOWED_APPS
+
+    stored = read_index()
+    index = {}
+    changed = []
+
+    for app_name in apps:
+        previous = stored.get(app_name, {})
+        files = index[app_name] = {}
+
+        for relative_path, path, mtime in iter_source_files(app_name):
+            entry = previous.get(relative_path)
+            if entry is not None and len(entry) == 3 and entry[0] == mtime:
+                files[relative_path] = entry
+                continue
+
+            sha1 = hash_file(path)
+            if entry is not None and len(entry) == 3 and entry[1] == sha1:
+                files[relative_path] = [mtime, sha1, entry[2]]
+            else:
+                files[relative_path] = [mtime, sha1, None]
+                changed.append((files[relative_path], path))
+
+    for (entry, _path), strings in zip(changed, extract_all([path for _entry, path in changed])):
+        entry[2] = strings
+
+    write_index(index)
+    return len(changed)
+
+
+def enqueue_refresh():
+    frappe.enqueue(
+        "rustic_translator.source_index.refresh_index",
+        queue="long",
+        job_id="rustic_translator::refresh_source_index",
+        deduplicate=True
+    )
+
+
+def after_migrate():
+    """Refresh the index in the background, the code of the apps may have changed"""
+    enqueue_refresh()
+
+
+def get_index_signature():
+    try:
+        stat = os.stat(get_index_path())
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def get_strings(signature):
+    """
+    Return {text: [(app_name, "app/path:line"), ...]}, or None while no index was built yet
+    - Reloaded only when the stored index changed since it was last read
+    """
+    with _lock:
+        if signature is None:
+            _index.update(strings=None, signature=None)
+        elif signature != _index["signature"]:
+            strings = {}
+            for app_name, files in read_index().items():
+                for relative_path, (_mtime, _sha1, entries) in files.items():
+                    for text, line in entries:
+                        strings.setdefault(text, []).append(
+                            (app_name, f"{app_name}/{relative_path}:{line}")
+                        )
+            _index.update(strings=strings, signature=signature)
+
+        return _index["strings"]
+
+
+def find_source(text):
+    """
+    Return {app_name: ["app/path:line", ...]} for the places a string is used
+    - Returns None and queues a build while there is no index yet
+    """
+    signature = get_index_signature()
+
+    # The index file is rewritten by every refresh, so its mtime is the refresh time
+    if signature is None or time.time() - signature[0] / 1e9 > REFRESH_INTERVAL:
+        enqueue_refresh()
+
+    strings = get_strings(signature)
+    if strings is None:
+        return None
+
+    locations = {}
+    for app_name, location in strings.get((text or "").strip(), ()):
+        locations.setdefault(app_name, []).append(location)
+    return locations
@@ -0,0 +1,262 @@
+"""
+SQLite working store for translation files.
+
+With the SQLite storage backend selected in Translation Manager Settings, the
+editor reads and writes a translation CSV through a mirror of it in a SQLite
+database in the site's private files, instead of through the parsed-file
+cache of every worker. The mirror holds every row under a permanent id with
+its position in the file, an index on the normalized source text, and an
+FTS5 trigram table over the folded text of the rows (see search_index),
+keyed by the id, for substring search. It survives restarts and is shared by
+all workers.
+
+The CSV stays the file of record: backups, the database sync and git all
+keep working on it. Every write is applied to the mirror in a transaction
+that is only committed once the same rows were written to the CSV, so the
+mirror is materialized back on every commit. Deleting a row renumbers the
+positions of the rows after it, as a fresh parse of the CSV would; their ids
+and so the FTS index stay as they are. The mirror records the
+version of the CSV it matches and is rebuilt from the CSV whenever the file
+was changed in any other way, such as a full save, a restore or a git pull.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+import frappe
+
+from rustic_translator.csv_store import LOCK_TIMEOUT, CSVTranslationStore
+from rustic_translator.file_cache import get_file_version, get_translation_file, invalidate, normalize_source
+from rustic_translator.search_index import fold, fold_row
+
+SCHEMA_VERSION = "2"
+
+# Trigram queries need at least this many characters, shorter ones are scanned
+MIN_FTS_QUERY = 3
+
+# Open connections of the current thread, by database path
+_connections = threading.local()
+
+
+def get_database_path(file_path):
+    digest = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:16]
+    return frappe.get_site_path("private", "rustic_translator", "stores", f"{digest}.sqlite3")
+
+
+def connect(database_path):
+    connections = _connections.__dict__.setdefault("by_path", {})
+    db = connections.get(database_path)
+    if db is None:
+        os.makedirs(os.path.dirname(database_path), exist_ok=True)
+        db = sqlite3.connect(database_path, timeout=LOCK_TIMEOUT, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        create_schema(db)
+        connections[database_path] = db
+    return db
+
+
+def create_schema(db):
+    db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    if get_meta(db, "schema") == SCHEMA_VERSION:
+        return
+
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.execute("DROP TABLE IF EXISTS rows")
+        db.execute("DROP TABLE IF EXISTS rows_fts")
+        db.execute("""
+            CREATE TABLE rows (
+                id INTEGER PRIMARY KEY,
+                position INTEGER NOT NULL,
+                source_key TEXT NOT NULL,
+                row TEXT NOT NULL,
+                is_empty INTEGER NOT NULL
+            )
+        """)
+        # Not unique, renumbering moves positions onto each other mid-statement
+        db.execute("CREATE INDEX rows_position ON rows (position)")
+        db.execute("CREATE INDEX rows_source_key ON rows (source_key, position)")
+        db.execute("CREATE INDEX rows_is_empty ON rows (is_empty, position)")
+
+        # Builds without FTS5 fall back to a plain table scanned with instr()
+        try:
+            db.execute("CREATE VIRTUAL TABLE rows_fts USING fts5(folded, tokenize='trigram')")
+            fts = "1"
+        except sqlite3.OperationalError:
+            db.execute("CREATE TABLE rows_fts (rowid INTEGER PRIMARY KEY, folded TEXT)")
+            fts = "0"
+
+        db.execute("DELETE FROM meta")
+        set_meta(db, "fts", fts)
+        set_meta(db, "schema", SCHEMA_VERSION)
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+
+
+def get_meta(db, key):
+    row = db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(db, key, value):
+    db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+
+class SQLiteTranslationStore:
+    """Row level reads and writes against the SQLite mirror of one translation CSV"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.db = connect(get_database_path(file_path))
+        self.fts = get_meta(self.db, "fts") == "1"
+
+        self.version = get_meta(self.db, "version")
+        if self.version != get_file_version(file_path):
+            self.rebuild()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def rebuild(self):
+        """Replace the mirror with the rows of the CSV as it is on disk"""
+        # Parsed afresh, so positions match what any worker parses from this file
+        invalidate(self.file_path)
+        translation_file = get_translation_file(self.file_path)
+
+        with self.transaction():
+            self.db.execute("DELETE FROM rows")
+            self.db.execute("DELETE FROM rows_fts")
+            for position, row in translation_file.iter_translations():
+                self._insert(position, row)
+            set_meta(self.db, "version", translation_file.version)
+
+        self.version = translation_file.version
+
+    def _insert(self, position, row):
+        cursor = self.db.execute(
+            "INSERT INTO rows (position, source_key, row, is_empty) VALUES (?, ?, ?, ?)",
+            (position, normalize_source(row[0]), json.dumps(list(row)), int(not row[1].strip()))
+        )
+        self.db.execute("INSERT INTO rows_fts (rowid, folded) VALUES (?, ?)", (cursor.lastrowid, fold_row(row)))
+
+    def _replace(self, row_id, row):
+        self.db.execute(
+            "UPDATE rows SET source_key = ?, row = ?, is_empty = ? WHERE id = ?",
+            (normalize_source(row[0]), json.dumps(list(row)), int(not row[1].strip()), row_id)
+        )
+        self.db.execute("UPDATE rows_fts SET folded = ? WHERE rowid = ?", (fold_row(row), row_id))
+
+    def _delete(self, row_id):
+        self.db.execute("DELETE FROM rows WHERE id = ?", (row_id,))
+        self.db.execute("DELETE FROM rows_fts WHERE rowid = ?", (row_id,))
+
+    def _get_id(self, position):
+        row = self.db.execute("SELECT id FROM rows WHERE position = ?", (position,)).fetchone()
+        return row[0] if row else None
+
+    def find(self, source_text):
+        """Return the position of the first row for source_text, or None"""
+        row = self.db.execute(
+            "SELECT MIN(position) FROM rows WHERE source_key = ?", (normalize_source(source_text),)
+        ).fetchone()
+        return row[0]
+
+    def find_all(self, source_text):
+        """Return the positions of every row for source_text, in file order"""
+        rows = self.db.execute(
+            "SELECT position FROM rows WHERE source_key = ? ORDER BY position", (normalize_source(source_text),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_row(self, position):
+        row = self.db.execute("SELECT row FROM rows WHERE position = ?", (position,)).fetchone()
+        return tuple(json.loads(row[0])) if row else None
+
+    def search(self, query=None, empty_only=False, start=0, page_length=None):
+        """Return ([(position, row), ...], filtered_count, total_count, empty_count) for one page"""
+        conditions = []
+        params = []
+
+        query = fold(query)
+        if query and self.fts and len(query) >= MIN_FTS_QUERY:
+            conditions.append("id IN (SELECT rowid FROM rows_fts WHERE rows_fts MATCH ?)")
+            params.append('"{}"'.format(query.replace('"', '""')))
+        elif query:
+            conditions.append("id IN (SELECT rowid FROM rows_fts WHERE instr(folded, ?) > 0)")
+            params.append(query)
+
+        if empty_only:
+            conditions.append("is_empty = 1")
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+        filtered_count = self.db.execute(f"SELECT COUNT(*) FROM rows{where}", params).fetchone()[0]
+        page = self.db.execute(
+            f"SELECT position, row FROM rows{where} ORDER BY position LIMIT ? OFFSET ?",
+            params + [page_length if page_length is not None else -1, start]
+        ).fetchall()
+        total_count, empty_count = self.db.execute("SELECT COUNT(*), TOTAL(is_empty) FROM rows").fetchone()
+
+        return (
+            [(position, tuple(json.loads(row))) for position, row in page],
+            filtered_count,
+            total_count,
+            int(empty_count)
+        )
+
+    def append_row(self, row):
+        """Append a row to the mirror and the CSV in one transaction"""
+        with self.transaction():
+            csv_store = CSVTranslationStore(self.file_path)
+            position = csv_store.append_row(row)
+            self._insert(position, tuple(row))
+            self._commit_version(csv_store)
+        return position
+
+    def replace_row(self, position, row):
+        self.apply_changes({position: row})
+
+    def delete_row(self, position):
+        self.apply_changes({position: None})
+
+    def apply_changes(self, changes):
+        """
+        Apply {position: row} to the mirror and the CSV in one transaction
+        - A row of None deletes the row at that position
+        """
+        with self.transaction():
+            for position, row in changes.items():
+                row_id = self._get_id(position)
+                if row is None:
+                    self._delete(row_id)
+                elif row_id is None:
+                    self._insert(position, tuple(row))
+                else:
+                    self._replace(row_id, tuple(row))
+
+            # A fresh parse of the CSV moves the rows after a deleted one up by
+            # one position, so the mirror does the same, last deletion first
+            for position in sorted((p for p, row in changes.items() if row is None), reverse=True):
+                self.db.execute("UPDATE rows SET position = position - 1 WHERE position > ?", (position,))
+
+            csv_store = CSVTranslationStore(self.file_path)
+            csv_store.apply_changes(changes)
+            self._commit_version(csv_store)
+
+    def _commit_version(self, csv_store):
+        self.version = csv_store.version
+        set_meta(self.db, "version", self.version)
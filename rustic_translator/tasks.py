@@ -0,0 +1,37 @@
+"""
+Scheduled jobs, registered in hooks.py.
+"""
+
+import time
+
+import frappe
+from frappe.utils import cint
+
+from rustic_translator.api.translation import cleanup_old_backups
+from rustic_translator.backup_store import collect_garbage
+
+
+def cleanup_backups():
+    """Apply the backup retention to every translation file, then drop unreferenced stored states"""
+    retention_count = cint(
+        frappe.db.get_single_value("Translation Manager Settings", "backup_retention_count")
+    ) or 10
+
+    files = frappe.get_all(
+        "Translation Backup",
+        filters={"is_active": 1},
+        fields=["app_name", "language_code"],
+        group_by="app_name, language_code"
+    )
+
+    for backup_file in files:
+        cleanup_old_backups(backup_file.app_name, backup_file.language_code, retention_count)
+
+    frappe.db.commit()
+
+    # Objects stored from here on are not in the list below, garbage collection keeps them
+    started_at = time.time()
+    collect_garbage(
+        frappe.get_all("Translation Backup", filters={"content_hash": ["is", "set"]}, pluck="content_hash"),
+        started_at
+    )
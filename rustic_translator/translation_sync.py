@@ -0,0 +1,327 @@
+"""
+Write translations from CSV rows into the Translation DocType.
+
+The CSV files are the source of truth; tabTranslation only mirrors them so the
+edits take effect immediately. The CSV is diffed against what is already in
+the database and only rows that are new, changed or gone are written, using a
+handful of batched statements instead of one query per row.
+
+tabTranslation gets generated source_hash and context_hash columns, the MD5
+of source_text and of the context (empty when there is none), and a unique
+key on (language, source_hash, context_hash). Source texts are TEXT and too
+long for a key of their own, and the hash also compares them exactly where
+the column collation would not. Frappe allows one translation per source text
+and context, so rows are identified by (source_text, context) throughout.
+Lookups of single source texts go through that key, and inserts are upserts
+against it, so a translation cannot end up twice in a language again.
+"""
+
+import hashlib
+
+import frappe
+
+# Rows per INSERT / UPDATE / IN-list statement
+BATCH_SIZE = 500
+
+UNIQUE_KEY = "rustic_translator_language_source"
+UNIQUE_KEY_COLUMNS = ["language", "source_hash", "context_hash"]
+
+
+def ensure_translation_index():
+    """
+    Add the hash columns and the unique key to tabTranslation if missing
+    - A key from an older version without the context is replaced
+    - Duplicate rows of the same source text and context are deleted first,
+      keeping the most recently modified one; other contexts are kept
+    - Called after every migrate, so a rebuilt table gets them back
+    """
+    if not frappe.db.sql("SHOW COLUMNS FROM `tabTranslation` LIKE 'source_hash'"):
+        frappe.db.sql_ddl("""
+            ALTER TABLE `tabTranslation`
+            ADD COLUMN source_hash CHAR(32) AS (MD5(source_text)) PERSISTENT
+        """)
+
+    if not frappe.db.sql("SHOW COLUMNS FROM `tabTranslation` LIKE 'context_hash'"):
+        frappe.db.sql_ddl("""
+            ALTER TABLE `tabTranslation`
+            ADD COLUMN context_hash CHAR(32) AS (MD5(IFNULL(context, ''))) PERSISTENT
+        """)
+
+    index = frappe.db.sql("SHOW INDEX FROM `tabTranslation` WHERE Key_name = %s", (UNIQUE_KEY,), as_dict=True)
+    if index:
+        if [row.Column_name for row in sorted(index, key=lambda row: row.Seq_in_index)] == UNIQUE_KEY_COLUMNS:
+            return
+        frappe.db.sql_ddl(f"ALTER TABLE `tabTranslation` DROP INDEX `{UNIQUE_KEY}`")
+
+    rows = frappe.db.sql("""
+        SELECT name, language, source_hash, context_hash FROM `tabTranslation`
+        WHERE source_hash IS NOT NULL
+        ORDER BY modified DESC
+    """)
+    seen = set()
+    duplicates = []
+    for name, language, source_hash, context_hash in rows:
+        if (language, source_hash, context_hash) in seen:
+            duplicates.append(name)
+        else:
+            seen.add((language, source_hash, context_hash))
+
+    delete_translations(duplicates)
+    frappe.db.commit()
+
+    frappe.db.sql_ddl(
+        "ALTER TABLE `tabTranslation` ADD UNIQUE INDEX `{}` ({})".format(UNIQUE_KEY, ", ".join(UNIQUE_KEY_COLUMNS))
+    )
+
+
+def sync_translations(language_code, translations, removed_keys=None):
+    """
+    Bring tabTranslation in line with a full translation file
+    - translations is an iterable of (source_text, translated_text, context),
+      consumed as a stream, see _apply_changes
+    - removed_keys are (source_text, context) pairs that were dropped from the file
+    - Duplicate rows for the same source text and context are removed, keeping the newest
+    - Returns counts of inserted, updated, unchanged and deleted rows
+    """
+    existing, duplicates = get_existing_translations(language_code)
+
+    to_delete = duplicates
+    for key in removed_keys or ():
+        if key in existing:
+            to_delete.append(existing.pop(key).name)
+
+    return _apply_changes(language_code, translations, existing, to_delete)
+
+
+def sync_translation_rows(language_code, rows, removed_keys=None):
+    """
+    Upsert only the given (source_text, translated_text, context) rows for a language
+    - Rows with an empty translation are removed from the database
+    - removed_keys are (source_text, context) pairs no row of the file has any more
+    - Returns counts of inserted, updated, unchanged and deleted rows
+    """
+    translations = {}
+    cleared = list(removed_keys or ())
+    for source_text, translated_text, context in rows:
+        source_text = (source_text or "").strip()
+        translated_text = (translated_text or "").strip()
+        if not source_text:
+            continue
+        key = (source_text, (context or "").strip() or None)
+        if translated_text:
+            translations[key] = translated_text
+        else:
+            cleared.append(key)
+
+    if not translations and not cleared:
+        return {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+    sources = list({source_text for source_text, _context in list(translations) + cleared})
+    existing, duplicates = get_existing_translations(language_code, sources)
+
+    to_delete = duplicates
+    for key in cleared:
+        if key in existing:
+            to_delete.append(existing.pop(key).name)
+
+    return _apply_changes(
+        language_code,
+        ((source_text, translated_text, context) for (source_text, context), translated_text in translations.items()),
+        existing,
+        to_delete
+    )
+
+
+def hash_text(text):
+    """Hash a translation the same way as MySQL's MD5()"""
+    return hashlib.md5((text or "").encode("utf-8")).hexdigest()
+
+
+def get_existing_translations(language_code, sources=None):
+    """
+    Return ({(source_text, context): row}, duplicate_names) for a language
+    - Rows carry name and translated_hash; translations are compared by hash
+      so they do not have to be held in memory
+    - Only the most recently modified row per source text and context is kept
+      in the map, a missing context is None
+    - sources limits the lookup to those source texts, in every context
+    """
+    query = """
+        SELECT name, source_text, MD5(translated_text) AS translated_hash, context FROM tabTranslation
+        WHERE language = %s {condition}
+        ORDER BY modified DESC
+    """
+
+    if sources is None:
+        batches = [frappe.db.sql(query.format(condition=""), (language_code,), as_dict=True)]
+    else:
+        batches = []
+        for i in range(0, len(sources), BATCH_SIZE):
+            batch = sources[i:i + BATCH_SIZE]
+            condition = "AND source_hash IN ({})".format(", ".join(["MD5(%s)"] * len(batch)))
+            batches.append(frappe.db.sql(query.format(condition=condition), [language_code] + batch, as_dict=True))
+
+    existing = {}
+    duplicates = []
+    for rows in batches:
+        for row in rows:
+            key = (row.source_text, row.context or None)
+            if key in existing:
+                duplicates.append(row.name)
+            else:
+                existing[key] = row
+
+    return existing, duplicates
+
+
+def _apply_changes(language_code, translations, existing, to_delete):
+    """
+    Write the difference between (source_text, translated_text, context) rows and existing
+    - Inserts and updates are flushed every BATCH_SIZE rows, so translations
+      can be a generator over a file of any size
+    - Of rows repeating a source text and context the last one wins, as when
+      Frappe loads the CSV: a repeat is always written again
+    """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": len(to_delete)}
+    to_insert = []
+    to_update = {}
+    seen = set()
+
+    delete_translations(to_delete)
+
+    for source_text, translated_text, context in translations:
+        key = (source_text, context)
+        repeated = key in seen
+        seen.add(key)
+
+        row = existing.get(key)
+        if row is None:
+            # A repeat updates the row inserted for the first one, see insert_translations
+            to_insert.append((
+                frappe.generate_hash(length=10),
+                language_code,
+                source_text,
+                translated_text,
+                context,
+                frappe.session.user,
+                frappe.session.user
+            ))
+            if not repeated:
+                counts["inserted"] += 1
+        elif repeated or row.translated_hash != hash_text(translated_text):
+            # Keyed by name, so a repeat in the same batch replaces the earlier update
+            to_update[row.name] = (row.name, translated_text, context)
+        else:
+            counts["unchanged"] += 1
+
+        if len(to_insert) >= BATCH_SIZE:
+            insert_translations(to_insert)
+            to_insert = []
+
+        if len(to_update) >= BATCH_SIZE:
+            update_translations(list(to_update.values()))
+            counts["updated"] += len(to_update)
+            to_update = {}
+
+    update_translations(list(to_update.values()))
+    insert_translations(to_insert)
+    counts["updated"] += len(to_update)
+
+    return counts
+
+
+def insert_translations(values, batch_size=BATCH_SIZE):
+    """
+    Insert (name, language, source_text, translated_text, context, owner, modified_by) tuples
+    - A row whose source text and context the language already has updates that row instead
+    """
+    for i in range(0, len(values), batch_size):
+        batch = values[i:i + batch_size]
+        frappe.db.sql("""
+            INSERT INTO `tabTranslation` (name, language, source_text, translated_text, context, creation, modified, owner, modified_by)
+            VALUES {}
+            ON DUPLICATE KEY UPDATE
+                translated_text = VALUES(translated_text),
+                context = VALUES(context),
+                modified = NOW(),
+                modified_by = VALUES(modified_by)
+        """.format(", ".join(["(%s, %s, %s, %s, %s, NOW(), NOW(), %s, %s)"] * len(batch))),
+            [item for row in batch for item in row]
+        )
+
+
+def upsert_translation(language_code, source_text, translated_text, context=None):
+    """
+    Set the translation of one source text and context in one statement
+    - The row is found through the unique key, so this is an index seek
+    """
+    frappe.db.sql("""
+        INSERT INTO `tabTranslation` (name, language, source_text, translated_text, context, creation, modified, owner, modified_by)
+        VALUES (%(name)s, %(language)s, %(source_text)s, %(translated_text)s, %(context)s, NOW(), NOW(), %(user)s, %(user)s)
+        ON DUPLICATE KEY UPDATE
+            translated_text = VALUES(translated_text),
+            context = VALUES(context),
+            modified = NOW(),
+            modified_by = VALUES(modified_by)
+    """, {
+        "name": frappe.generate_hash(length=10),
+        "language": language_code,
+        "source_text": source_text,
+        "translated_text": translated_text,
+        "context": context,
+        "user": frappe.session.user
+    })
+
+
+def delete_translation_source(language_code, source_text, contexts=None):
+    """
+    Delete the Translation rows of one source text through the unique key
+    - contexts limits the delete to rows with those contexts, None for no context
+    """
+    condition = ""
+    params = [language_code, source_text]
+    if contexts is not None:
+        if not contexts:
+            return
+        condition = "AND context_hash IN ({})".format(", ".join(["MD5(%s)"] * len(contexts)))
+        params += [context or "" for context in contexts]
+
+    frappe.db.sql(
+        f"DELETE FROM `tabTranslation` WHERE language = %s AND source_hash = MD5(%s) {condition}",
+        params
+    )
+
+
+def update_translations(values, batch_size=BATCH_SIZE, update_context=True):
+    """
+    Update (name, translated_text, context) tuples with one CASE statement per batch
+    - With update_context off the context column is left as it is
+    """
+    for i in range(0, len(values), batch_size):
+        batch = values[i:i + batch_size]
+        cases = " ".join(["WHEN %s THEN %s"] * len(batch))
+        params = [item for name, translated_text, _context in batch for item in (name, translated_text)]
+        context_clause = ""
+        if update_context:
+            context_clause = "context = CASE name {cases} END,".format(cases=cases)
+            params += [item for name, _translated_text, context in batch for item in (name, context)]
+
+        frappe.db.sql("""
+            UPDATE `tabTranslation`
+            SET translated_text = CASE name {cases} END,
+                {context_clause}
+                modified = NOW()
+            WHERE name IN ({names})
+        """.format(cases=cases, context_clause=context_clause, names=", ".join(["%s"] * len(batch))),
+            params + [name for name, _translated_text, _context in batch]
+        )
+
+
+def delete_translations(names, batch_size=BATCH_SIZE):
+    """Delete Translation rows by name with IN-list statements"""
+    for i in range(0, len(names), batch_size):
+        batch = names[i:i + batch_size]
+        frappe.db.sql(
+            "DELETE FROM tabTranslation WHERE name IN ({})".format(", ".join(["%s"] * len(batch))),
+            batch
+        )